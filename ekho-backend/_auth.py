@@ -0,0 +1,30 @@
+"""
+Shared service-account auth for the Veo CLI scripts.
+
+Both test_veo_direct and test_veo_fetch need a bearer token for the Vertex
+endpoints; parsing the key file and signing a JWT per call costs an RSA
+signature plus an HTTPS exchange, so the credentials live here once and
+refresh only when the hour-long token actually lapses.
+"""
+import os
+
+from google.oauth2 import service_account
+from google.auth.transport.requests import Request
+
+SERVICE_ACCOUNT_FILE = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS") or r"C:\Users\Vexo4\Documents\ekho-app\ekho-backend\service-account.json"
+
+_creds = None
+
+
+def get_token() -> str:
+    global _creds
+    if _creds is None:
+        if not os.path.exists(SERVICE_ACCOUNT_FILE):
+            raise FileNotFoundError(f"Service account file not found at: {SERVICE_ACCOUNT_FILE}")
+        _creds = service_account.Credentials.from_service_account_file(
+            SERVICE_ACCOUNT_FILE,
+            scopes=["https://www.googleapis.com/auth/cloud-platform"],
+        )
+    if not _creds.valid:
+        _creds.refresh(Request())
+    return _creds.token
@@ -1,10 +1,20 @@
 from fastapi import (
-    APIRouter, HTTPException, BackgroundTasks, 
-    UploadFile, File, Path
+    APIRouter, HTTPException, BackgroundTasks,
+    UploadFile, File, Path, Query, Request, Response
 )
+from fastapi.responses import ORJSONResponse
 from typing import Optional, List
 from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import lru_cache
+import os
+import time
+import uuid
+import shutil
+import tempfile
+from cachetools import TTLCache
 from app.config import get_settings
+from app.log import logger
 import asyncio # <-- IMPORT ASYNCIO
 
 # --- 1. IMPORT ALL SCHEMAS ---
@@ -17,50 +27,185 @@ from app.models.schemas import (
     ChatRequest,
     ChatResponse,
     CloneVoiceResponse,
+    MediaStatusResponse,
 )
 # --- 2. IMPORT ALL SERVICES ---
-from app.services.veo_service import VeoServiceREST
-from app.services.storage_service import StorageService
-from app.services.mongodb_service import MongoDBService
-from app.services.snowflake_service import SnowflakeService
-from app.services.gemini_service import GeminiService
-from app.services.elevenlabs_service import ElevenLabsService
-from app.services.voice_analysis import VoiceAnalyzer # <-- IMPORT NEW SERVICE
+from app.services.veo_service import get_veo_service
+from app.services.storage_service import get_storage_service
+from app.services.mongodb_service import get_mongodb_service
+from app.services.snowflake_service import get_snowflake_service
+from app.services.gemini_service import get_gemini_service
+from app.services.elevenlabs_service import get_elevenlabs_service
+from app.services.voice_analysis import get_voice_analyzer # <-- IMPORT NEW SERVICE
 # 🔹 ADK orchestration
-from app.services.adk_service import ADKAgentService
+from app.services.adk_service import get_adk_service
 
 router = APIRouter(prefix="/api/v1", tags=["ekho"])
 
 # --- 3. LOAD SETTINGS & INSTANTIATE ALL SERVICES ---
+# Every service comes from a cached factory so this module and the ADK
+# orchestrator share one client (and connection pool) per process.
 settings = get_settings()
 
-storage_service = StorageService()
-mongodb_service = MongoDBService()
-snowflake_service = SnowflakeService()
-gemini_service = GeminiService()
-elevenlabs_service = ElevenLabsService()
-voice_analyzer = VoiceAnalyzer() # <-- INSTANTIATE NEW SERVICE
-adk_service = ADKAgentService()
+storage_service = get_storage_service()
+mongodb_service = get_mongodb_service()
+snowflake_service = get_snowflake_service()
+gemini_service = get_gemini_service()
+elevenlabs_service = get_elevenlabs_service()
+voice_analyzer = get_voice_analyzer()
+adk_service = get_adk_service()
+veo_service = get_veo_service()
 
 
-default_output_uri = f"gs://{settings.storage_bucket}/video-outputs/"
-
-veo_service = VeoServiceREST(project_id=settings.google_cloud_project,
-                             location=settings.google_cloud_location,
-                             model_id="veo-3.1-generate-preview",
-                             output_storage_uri=default_output_uri
-                             )
+# Bound in-flight upstream calls so a traffic spike can't exhaust connection
+# pools or external quotas. Limits are tunable via settings.
+_veo_sem = asyncio.Semaphore(settings.veo_max_concurrency)
+_eleven_sem = asyncio.Semaphore(settings.elevenlabs_max_concurrency)
 
 
 # --- 4. HELPER FUNCTION ---
+
+# Built once at import time so each call is a single hashed lookup instead of
+# rebuilding two lists and scanning them per message.
+_NEGATIVE_TAGS = frozenset({"anxious", "sad", "worried", "error"})
+_POSITIVE_TAGS = frozenset({"happy", "hopeful", "calm", "energetic", "positive"})
+_SENTIMENT_SCORES = (
+    {tag: -0.5 for tag in _NEGATIVE_TAGS} | {tag: 0.5 for tag in _POSITIVE_TAGS}
+)
+
+
 def _calculate_sentiment(emotional_tag: str) -> float:
     """Converts a string emotion tag into a numeric score for analytics."""
-    tag = (emotional_tag or "").lower()
-    if tag in ["anxious", "sad", "worried", "error"]:
-        return -0.5
-    if tag in ["happy", "hopeful", "calm", "energetic", "positive"]:
-        return 0.5
-    return 0.0
+    tag = emotional_tag or ""
+    # Tags from the classifiers are already lowercase; skip the copy then.
+    if not tag.islower():
+        tag = tag.lower()
+    return _SENTIMENT_SCORES.get(tag, 0.0)
+
+
+# The mode/emotion classifiers are deterministic string functions, so repeated
+# short phrases ("hi", "thanks", greetings) can skip the regex work entirely.
+# Keys are normalized to keep the cache small and hit-rate high.
+def _classifier_key(text: str) -> str:
+    return (text or "").strip().lower()[:128]
+
+
+@lru_cache(maxsize=4096)
+def _detect_mode_cached(msg_key: str) -> str:
+    return adk_service.detect_mode(msg_key)
+
+
+@lru_cache(maxsize=4096)
+def _tag_emotion_cached(text_key: str) -> str:
+    return adk_service.tag_emotion(text_key)
+
+
+# Formatting an aware ISO timestamp is surprisingly heavy for something
+# polled at k8s-probe rates, so cache the string with 1s granularity.
+_last_iso = [0.0, ""]
+
+
+def _now_iso() -> str:
+    t = time.time()
+    if t - _last_iso[0] > 1.0:
+        _last_iso[0] = t
+        _last_iso[1] = datetime.fromtimestamp(t, timezone.utc).isoformat()
+    return _last_iso[1]
+
+
+
+
+# In-memory status store for background audio/video production, keyed by
+# media_job_id (same pattern as veo_service.jobs for video operations).
+# TTL-bounded like that store: records age out with their signed URLs
+# instead of accumulating for the life of the process.
+_media_jobs: TTLCache = TTLCache(maxsize=10_000, ttl=86_400)
+
+
+async def _produce_media(
+    media_job_id: str,
+    user_id: str,
+    reply_text: str,
+    voice_id: Optional[str],
+    avatar_refs: List[str],
+):
+    """Background task: kick off Veo and generate/upload/sign TTS audio."""
+    job = _media_jobs[media_job_id]
+    try:
+        # --- Veo kick-off ---
+        try:
+            async with _veo_sem:
+                result = await veo_service.generate_avatar_video(
+                    user_id=user_id,
+                    prompt=reply_text,
+                    reference_images=avatar_refs,
+                    duration=10,
+                    style="conversational",
+                )
+            job["video_job_id"] = result.get("job_id")
+        except Exception:
+            logger.exception("Veo kick-off failed for media job %s", media_job_id)
+
+        # --- ElevenLabs audio ---
+        if voice_id:
+            try:
+                async with _eleven_sem:
+                    audio_bytes = await elevenlabs_service.generate_speech(
+                        text=reply_text,
+                        voice_id=voice_id
+                    )
+                # uuid keys are cheaper than ISO timestamps and can't collide
+                # when two replies land in the same second.
+                audio_gcs_path = f"users/{user_id}/audio/{uuid.uuid4().hex}.mp3"
+                # Upload and URL signing are fused: the signed URL comes back
+                # as soon as it's computed while the upload runs concurrently.
+                job["audio_url"] = await storage_service.upload_and_sign(
+                    audio_bytes,
+                    audio_gcs_path,
+                    content_type="audio/mpeg"
+                )
+            except Exception:
+                logger.exception("ElevenLabs audio failed for media job %s", media_job_id)
+        else:
+            logger.warning("No voice_id found for user %s. Skipping audio generation.", user_id)
+
+        job["status"] = "completed"
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+        logger.exception("Media production failed for job %s", media_job_id)
+    finally:
+        job["updated_at"] = datetime.now(timezone.utc).isoformat()
+
+
+async def _persist_chat_best_effort(
+    user_id: str,
+    user_message: str,
+    ai_response: str,
+    emotional_tag: str,
+    mode: str,
+    sentiment_score: float,
+):
+    """Background persistence for chat: Mongo save + Snowflake log, best-effort."""
+    results = await asyncio.gather(
+        mongodb_service.save_conversation(
+            user_id=user_id,
+            user_message=user_message,
+            ai_response=ai_response,
+            emotional_tag=emotional_tag,
+            mode=mode,
+        ),
+        snowflake_service.log_conversation_analytic(
+            user_id=user_id,
+            emotional_tag=emotional_tag,
+            conversation_mode=mode,
+            sentiment_score=sentiment_score,
+        ),
+        return_exceptions=True,
+    )
+    for r in results:
+        if isinstance(r, Exception):
+            logger.warning("Post-chat persistence failed: %s", r)
 
 
 
@@ -69,7 +214,8 @@ def _calculate_sentiment(emotional_tag: str) -> float:
 
 @router.post("/clone-voice/{user_id}", response_model=CloneVoiceResponse)
 async def clone_voice(
-    user_id: str = Path(..., description="The user ID to associate the voice with"), 
+    background_tasks: BackgroundTasks,
+    user_id: str = Path(..., description="The user ID to associate the voice with"),
     audio_file: UploadFile = File(...)
 ):
     """
@@ -77,15 +223,23 @@ async def clone_voice(
     analyzes its features, and saves all data.
     """
     try:
-        # Read file once, then run tasks in parallel
-        audio_bytes = await audio_file.read()
-        
-        clone_task = elevenlabs_service.clone_voice(audio_bytes, user_id)
-        analysis_task = voice_analyzer.analyze_voice_features(audio_bytes)
-        
-        # Run both operations concurrently
-        results = await asyncio.gather(clone_task, analysis_task)
-        
+        # Stream the upload to a temp file instead of materializing the whole
+        # clip in RAM, then give each consumer its own read handle so both
+        # can run in parallel without copying the audio again.
+        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".audio")
+        try:
+            await asyncio.to_thread(shutil.copyfileobj, audio_file.file, tmp)
+            tmp.close()
+
+            with open(tmp.name, "rb") as clone_src, open(tmp.name, "rb") as analysis_src:
+                clone_task = elevenlabs_service.clone_voice(clone_src, user_id)
+                analysis_task = voice_analyzer.analyze_voice_features(analysis_src)
+
+                # Run both operations concurrently
+                results = await asyncio.gather(clone_task, analysis_task)
+        finally:
+            os.unlink(tmp.name)
+
         voice_id = results[0]
         voice_features = results[1]
         
@@ -97,11 +251,13 @@ async def clone_voice(
             {"voice_id": voice_id}
         )
         
-        # 2. Save the voice features to Snowflake
+        # 2. Save the voice features to Snowflake (analytics only — no need
+        # to hold the response for the write)
         if voice_features and "error" not in voice_features:
-            await snowflake_service.log_voice_analytic(
-                user_id, 
-                voice_features, 
+            background_tasks.add_task(
+                snowflake_service.log_voice_analytic,
+                user_id,
+                voice_features,
                 tag="baseline_onboarding"
             )
         
@@ -112,19 +268,23 @@ async def clone_voice(
         )
         
     except Exception as e:
-        print(f"❌ Failed to clone voice for user {user_id}: {e}")
+        logger.exception("Failed to clone voice for user %s", user_id)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/health", response_model=HealthCheckResponse)
-async def health_check():
-    """Health check endpoint to verify service is running."""
-    # check_connection is now async, so it must be awaited
-    storage_connected = await storage_service.check_connection() # <-- FIXED
+async def health_check(request: Request):
+    """
+    Health check endpoint to verify service is running.
+    Reads the cached result of the background storage prober (see main.py)
+    instead of hitting GCS on every poll.
+    """
+    storage_connected = bool(getattr(request.app.state, "storage_ok", False))
     return HealthCheckResponse(
         status="healthy" if storage_connected else "degraded",
         service="ekho-api",
-        timestamp=datetime.now(timezone.utc).isoformat(),
+        timestamp=_now_iso(),
         google_cloud_connected=storage_connected,
+        last_checked_at=getattr(request.app.state, "storage_checked_at", None),
     )
 
 
@@ -132,28 +292,28 @@ async def health_check():
 # Legacy, fuller chat flow retained (fixed to use existing Gemini method)
 # ──────────────────────────────────────────────────────────────────────────────
 @router.post("/chat_full", response_model=ChatResponse)
-async def chat_full(request: ChatRequest):
+async def chat_full(request: ChatRequest, background_tasks: BackgroundTasks):
     """
     Handle a user's chat message and return an AI response.
     Orchestrates MongoDB, Gemini, Snowflake, and optionally Veo.
     """
     try:
-        # 1) Get user data & history from MongoDB
-        user_profile = await mongodb_service.get_user_profile(request.user_id)
+        # 1+2) Profile, history, and the Gemini reply are mutually independent
+        # (the prompt only needs the message), so run all three in parallel.
+        user_profile, history, reply_text = await asyncio.gather(
+            mongodb_service.get_user_profile_cached(request.user_id),
+            mongodb_service.get_conversation_history(request.user_id),
+            gemini_service.generate(
+                user_message=request.message, user_name=request.user_id
+            ),
+        )
         if not user_profile:
             user_profile = {"user_id": request.user_id, "name": "User"}
-        history = await mongodb_service.get_conversation_history(request.user_id)
-        print(f"Retrieved {len(history)} history items for user {request.user_id}")
-        
-        # 2) Generate text via the working Gemini wrapper
-        # gemini_service.generate is async, so it must be awaited
-        reply_text = await gemini_service.generate( # <-- FIXED
-            user_message=request.message, user_name=request.user_id
-        )
+        logger.info("Retrieved %d history items for user %s", len(history), request.user_id)
 
-        # Derive mode/tone locally
-        mode = adk_service.detect_mode(request.message)
-        tone = adk_service.tag_emotion(reply_text)
+        # Derive mode/tone locally (cached — repeated phrases skip the regexes)
+        mode = _detect_mode_cached(_classifier_key(request.message))
+        tone = _tag_emotion_cached(_classifier_key(reply_text))
 
         # 3) Optional Veo kick-off (best-effort)
         video_url_to_return: Optional[str] = None
@@ -161,44 +321,51 @@ async def chat_full(request: ChatRequest):
 
         if getattr(request, "make_video", False):
             try:
-                # --- BUG FIX: Get avatar refs from user_profile ---
-                avatar_refs = user_profile.get("avatar_reference_urls", []) 
-
-                video_job_result = await veo_service.generate_avatar_video(
-                    user_id=request.user_id,
-                    prompt=reply_text,
-                    reference_images=avatar_refs, # <-- FIXED
-                    duration=max(5, min(30, len(reply_text) // 15)),
-                    style="conversational",
-                )
-                video_job_id_to_return = video_job_result.get("job_id")
+                # Fail fast when Veo is saturated instead of queueing behind
+                # the semaphore — the text reply still goes out immediately.
+                await asyncio.wait_for(_veo_sem.acquire(), timeout=0.5)
+                try:
+                    # --- BUG FIX: Get avatar refs from user_profile ---
+                    avatar_refs = user_profile.get("avatar_reference_urls", [])
+
+                    # Length heuristic, only evaluated on the video branch.
+                    # (Veo clamps reference-to-video to 8s regardless.)
+                    n = len(reply_text)
+                    estimated_duration = 5 if n < 75 else 30 if n > 450 else n // 15
+
+                    video_job_result = await veo_service.generate_avatar_video(
+                        user_id=request.user_id,
+                        prompt=reply_text,
+                        reference_images=avatar_refs, # <-- FIXED
+                        duration=estimated_duration,
+                        style="conversational",
+                    )
+                    video_job_id_to_return = video_job_result.get("job_id")
+                finally:
+                    _veo_sem.release()
+            except asyncio.TimeoutError:
+                logger.warning("Veo kickoff rejected: too many in-flight jobs")
+                video_job_id_to_return = "error: busy"
             except Exception as e:
-                print(f"❌ Error during video job kickoff: {str(e)}")
+                logger.exception("Error during video job kickoff")
                 video_job_id_to_return = f"error: {str(e)}"
         else:
             video_url_to_return = "https://storage.googleapis.com/ekho-placeholder-video.mp4"
 
-        # 4) Save conversation to MongoDB
-        await mongodb_service.save_conversation(
+        # 4+5) Save conversation to MongoDB and log analytics to Snowflake.
+        # The client doesn't need either write, so run both after the response
+        # is sent instead of paying two network RTTs on the request path.
+        sentiment_score = _calculate_sentiment(tone)
+        background_tasks.add_task(
+            _persist_chat_best_effort,
             user_id=request.user_id,
             user_message=request.message,
             ai_response=reply_text,
             emotional_tag=tone,
             mode=mode,
+            sentiment_score=sentiment_score,
         )
 
-        # 5) Log analytics to Snowflake (best-effort)
-        try:
-            sentiment_score = _calculate_sentiment(tone)
-            await snowflake_service.log_conversation_analytic(
-                user_id=request.user_id,
-                emotional_tag=tone,
-                conversation_mode=mode,
-                sentiment_score=sentiment_score,
-            )
-        except Exception as e:
-            print(f"Snowflake logging failed: {e}")
-
         # 6) Return response
         return ChatResponse(
             text=reply_text,
@@ -209,7 +376,7 @@ async def chat_full(request: ChatRequest):
         )
 
     except Exception as e:
-        print(f"❌ Error in /chat_full endpoint: {str(e)}")
+        logger.exception("Error in /chat_full endpoint")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -217,7 +384,7 @@ async def chat_full(request: ChatRequest):
 # MVP Chat + ADK orchestration (primary endpoint used by Swagger/frontend)
 # ──────────────────────────────────────────────────────────────────────────────
 @router.post("/chat", response_model=ChatResponse)
-async def chat(req: ChatRequest):
+async def chat(req: ChatRequest, background_tasks: BackgroundTasks):
     """
     User sends message, get AI response text.
     If make_video=True, also start Veo generation and ElevenLabs audio.
@@ -227,60 +394,46 @@ async def chat(req: ChatRequest):
         user_id = req.user_id
         message = req.message
 
-        # 1) Run ADK agents in parallel (memory, trends, safety)
-        ctx = await adk_service.orchestrate(user_id, message)
-        suggested_mode = ctx.get("suggested_mode") or adk_service.detect_mode(message)
-        
-        voice_id = ctx.get("voice_id") # Fetched from user profile via ADK
+        # 1+2) The Gemini prompt only needs the message, not the agent
+        # context, so the reply generates in parallel with the ADK
+        # orchestration: total latency is max(T_gemini, T_ctx), not the sum.
+        ctx, reply_text = await asyncio.gather(
+            adk_service.orchestrate(user_id, message),
+            gemini_service.generate(message, user_name=user_id),
+        )
+        suggested_mode = ctx.get("suggested_mode") or _detect_mode_cached(_classifier_key(message))
 
-        # 2) Generate a warm reply (Gemini wrapper or stub)
-        reply_text = await gemini_service.generate(message, user_name=user_id) # <-- FIXED
+        voice_id = ctx.get("voice_id") # Fetched from user profile via ADK
 
-        # 3) Optionally kick off Veo video & ElevenLabs audio
-        video_job_id: Optional[str] = None
-        audio_url: Optional[str] = None
+        # 3) Optionally produce Veo video & ElevenLabs audio in the background.
+        # The text reply goes back immediately; the client polls
+        # /media-status/{media_job_id} for the audio/video URLs.
+        media_job_id: Optional[str] = None
 
         if getattr(req, "make_video", False):
-            # --- Veo Generation (existing code) ---
-            try:
-                avatar_refs = ctx.get("avatar_reference_urls", []) # Get refs from ADK context
-                
-                result = await veo_service.generate_avatar_video(
-                    user_id=user_id,
-                    prompt=reply_text,
-                    reference_images=avatar_refs, # <-- Use real refs
-                    duration=10,
-                    style="conversational",
-                )
-                video_job_id = result.get("job_id")
-            except Exception as e:
-                print("⚠️ Veo kick-off failed in /chat:", e)
-
-            # --- NEW: ElevenLabs Audio Generation ---
-            if voice_id:
-                try:
-                    audio_bytes = await elevenlabs_service.generate_speech(
-                        text=reply_text,
-                        voice_id=voice_id
-                    
-                    )
-                    audio_gcs_path = f"users/{user_id}/audio/{datetime.now(timezone.utc).isoformat()}.mp3"
-                    await storage_service.upload_file_bytes(
-                        audio_bytes,
-                        audio_gcs_path,
-                        content_type="audio/mpeg"
-                    )
-                    
-                    audio_url = await storage_service.get_signed_url(audio_gcs_path)
-
-                except Exception as e:
-                    print(f"⚠️ ElevenLabs audio generation failed in /chat: {e}")
-            else:
-                print(f"⚠️ No voice_id found for user {user_id}. Skipping audio generation.")
-            # --- END NEW ---
+            media_job_id = f"media_{user_id}_{uuid.uuid4().hex[:8]}"
+            _media_jobs[media_job_id] = {
+                "job_id": media_job_id,
+                "status": "processing",
+                "audio_url": None,
+                "video_job_id": None,
+                "error": None,
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            }
+            background_tasks.add_task(
+                _produce_media,
+                media_job_id,
+                user_id,
+                reply_text,
+                voice_id,
+                ctx.get("avatar_reference_urls", []),
+            )
 
-        # 4) Persist chat & analytics via ADK helper
-        log_meta = await adk_service.log_after_chat(
+        # 4) Decide mode/tone inline (cheap heuristics), then persist
+        # chat & analytics via the ADK helper after the response is sent.
+        emotional_tone = _tag_emotion_cached(_classifier_key(f"{message} {reply_text}"))
+        background_tasks.add_task(
+            adk_service.log_after_chat,
             user_id=user_id,
             user_message=message,
             ai_response=reply_text,
@@ -291,17 +444,30 @@ async def chat(req: ChatRequest):
         return ChatResponse(
             text=reply_text,
             video_url=None,
-            video_job_id=video_job_id,
-            audio_url=audio_url,
-            mode=log_meta.get("mode", suggested_mode),
-            emotional_tone=log_meta.get("emotional_tag", "neutral"),
+            video_job_id=None,
+            audio_url=None,
+            media_job_id=media_job_id,
+            mode=suggested_mode,
+            emotional_tone=emotional_tone,
         )
 
     except Exception as e:
-        print(f"❌ Error in /chat endpoint: {str(e)}")
+        logger.exception("Error in /chat endpoint")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/media-status/{job_id}", response_model=MediaStatusResponse)
+async def get_media_status(job_id: str):
+    """
+    Check status of background audio/video production for a chat reply.
+    Frontend polls this after receiving media_job_id from /chat.
+    """
+    job = _media_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Media job {job_id} not found")
+    return MediaStatusResponse(**job)
+
+
 @router.post("/generate-avatar", response_model=VideoGenerationResponse)
 async def generate_avatar(
     request: AvatarCreationRequest, background_tasks: BackgroundTasks
@@ -311,9 +477,10 @@ async def generate_avatar(
     Main endpoint for onboarding flow.
     """
     try:
-        print(f"📸 Creating avatar for user: {request.user_id}")
-        print(f"   - Face captures: {len(request.face_captures)}")
-        print(f"   - Age progression: {request.age_progression_years} years")
+        logger.info(
+            "Creating avatar for user %s (%d captures, +%d years)",
+            request.user_id, len(request.face_captures), request.age_progression_years,
+        )
 
         result = await veo_service.create_aged_avatar(
             user_id=request.user_id,
@@ -338,7 +505,7 @@ async def generate_avatar(
         )
 
     except Exception as e:
-        print(f"❌ Error creating avatar: {str(e)}")
+        logger.exception("Error creating avatar")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -349,10 +516,10 @@ async def generate_video(request: VideoGenerationRequest):
     Used for monthly recaps and custom content.
     """
     try:
-        print(f"🎬 Generating video for user: {request.user_id}")
-        print(f"   - Prompt: {request.prompt[:50]}...")
-        print(f"   - Duration: {request.duration}s")
-        print(f"   - Style: {request.style}")
+        logger.info(
+            "Generating video for user %s (%ds, style=%s): %.50s...",
+            request.user_id, request.duration, request.style, request.prompt,
+        )
 
         result = await veo_service.generate_avatar_video(
             user_id=request.user_id,
@@ -370,30 +537,78 @@ async def generate_video(request: VideoGenerationRequest):
         )
 
     except Exception as e:
-        print(f"❌ Error generating video: {str(e)}")
+        logger.exception("Error generating video")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/video-status/{job_id}", response_model=VideoStatusResponse)
-async def get_video_status(job_id: str):
+# Concurrent pollers of the same job collapse into one upstream Veo call.
+_job_status_cache = TTLCache(maxsize=10_000, ttl=2)
+
+
+@router.get("/video-status/{job_id}")
+async def get_video_status(job_id: str, request: Request):
     """
     Check status of video generation job.
-    Frontend polls this endpoint for updates.
+    Frontend polls this endpoint for updates; unchanged polls get a 304.
+
+    Returns the VideoStatusResponse shape as a plain dict: this is the
+    hottest route, so we skip the response_model validation/encode round
+    trip and serialize straight through orjson.
     """
     try:
-        status = await veo_service.get_job_status(job_id)
-
-        return VideoStatusResponse(
-            job_id=status.get("job_id", job_id),
-            status=status.get("status", "unknown"),
-            progress=status.get("progress", 0),
-            video_url=status.get("video_url"),
-            error=status.get("error"),
-            created_at=status.get("created_at", ""),
-            updated_at=status.get("updated_at", ""),
+        status = _job_status_cache.get(job_id)
+        if status is None:
+            status = await veo_service.get_job_status(job_id)
+            _job_status_cache[job_id] = status
+
+        # Weak ETag over the fields a poller actually cares about: identical
+        # polls skip serialization and bytes-on-wire entirely. updated_at is
+        # included so a failed->retried job with the same progress still
+        # invalidates.
+        etag = (
+            f'W/"{status.get("status")}:{status.get("progress", 0)}'
+            f':{status.get("updated_at", "")}"'
         )
 
-        
+        # Last-Modified mirrors updated_at for clients that only do
+        # If-Modified-Since; sub-second changes fall back to the ETag.
+        updated_dt: Optional[datetime] = None
+        last_modified = None
+        if status.get("updated_at"):
+            updated_dt = datetime.fromisoformat(status["updated_at"])
+            last_modified = format_datetime(updated_dt, usegmt=True)
+
+        not_modified = request.headers.get("if-none-match") == etag
+        if not not_modified and updated_dt is not None:
+            ims = request.headers.get("if-modified-since")
+            if ims:
+                try:
+                    not_modified = updated_dt.replace(microsecond=0) <= \
+                        parsedate_to_datetime(ims)
+                except (TypeError, ValueError):
+                    pass
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if last_modified:
+            headers["Last-Modified"] = last_modified
+
+        if not_modified:
+            return Response(status_code=304, headers=headers)
+
+        return ORJSONResponse(
+            {
+                "job_id": status.get("job_id", job_id),
+                "status": status.get("status", "unknown"),
+                "progress": status.get("progress", 0),
+                "video_url": status.get("video_url"),
+                "error": status.get("error"),
+                "created_at": status.get("created_at", ""),
+                "updated_at": status.get("updated_at", ""),
+            },
+            headers=headers,
+        )
+
+
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -401,10 +616,23 @@ async def get_video_status(job_id: str):
 
 
 @router.get("/user/{user_id}/jobs")
-async def get_user_jobs(user_id: str):
-    """Get all video generation jobs for a user."""
+async def get_user_jobs(
+    user_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+):
+    """
+    Get a page of video generation jobs for a user (newest first).
+    Pass the returned next_cursor to fetch the following page; a null
+    next_cursor means there are no more jobs.
+    """
     try:
-        jobs = veo_service.list_user_jobs(user_id)
-        return {"user_id": user_id, "jobs": jobs, "count": len(jobs)}
+        page = veo_service.list_user_jobs(user_id, limit=limit, cursor=cursor)
+        return {
+            "user_id": user_id,
+            "jobs": page["jobs"],
+            "next_cursor": page["next_cursor"],
+            "limit": limit,
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
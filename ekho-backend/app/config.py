@@ -1,10 +1,11 @@
 # app/config.py
-from dotenv import load_dotenv
-load_dotenv()
-
+# .env is loaded once in main.py (before any app imports); Settings also reads
+# env_file directly, so there is no second dotenv pass here.
 from functools import lru_cache
-from pydantic import Field
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Annotated
+
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 class Settings(BaseSettings):
     # read from .env and environment (case-insensitive)
@@ -27,6 +28,8 @@ class Settings(BaseSettings):
     max_video_duration: int = Field(30, alias="MAX_VIDEO_DURATION")
     max_reference_images: int = Field(5, alias="MAX_REFERENCE_IMAGES")
     rate_limit_per_minute: int = Field(10, alias="RATE_LIMIT_PER_MINUTE")
+    veo_max_concurrency: int = Field(16, alias="VEO_MAX_CONCURRENCY")
+    elevenlabs_max_concurrency: int = Field(8, alias="ELEVENLABS_MAX_CONCURRENCY")
 
     # Gemini (required)
     gemini_api_key: str = Field(..., alias="GEMINI_API_KEY")
@@ -34,6 +37,21 @@ class Settings(BaseSettings):
     # Environment
     environment: str = Field("development", alias="ENVIRONMENT")
 
+    # CORS (comma-separated list of allowed browser origins). NoDecode stops
+    # pydantic-settings from JSON-decoding the env value before the validator
+    # runs — without it a plain comma list raises SettingsError at load.
+    allowed_origins: Annotated[list[str], NoDecode] = Field(
+        default_factory=lambda: ["http://localhost:3000"],
+        alias="ALLOWED_ORIGINS",
+    )
+
+    @field_validator("allowed_origins", mode="before")
+    @classmethod
+    def _split_origins(cls, v):
+        if isinstance(v, str):
+            return [o.strip() for o in v.split(",") if o.strip()]
+        return v
+
     # MongoDB (required)
     mongodb_uri: str = Field(..., alias="MONGODB_URI")
 
@@ -0,0 +1,27 @@
+# app/http_client.py
+"""
+Process-wide httpx.AsyncClient.
+
+Services that talk to upstream REST APIs (Veo/Vertex today) share this one
+client so TCP+TLS connections are reused across requests instead of paying
+a fresh handshake per call.
+"""
+from functools import lru_cache
+
+import httpx
+
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=128, max_keepalive_connections=64),
+        timeout=30,
+    )
+
+
+async def close_http_client():
+    """Close the shared client (call from app shutdown)."""
+    if get_http_client.cache_info().currsize:
+        await get_http_client().aclose()
+        get_http_client.cache_clear()
@@ -0,0 +1,29 @@
+# app/log.py
+"""
+Non-blocking logging for Ekho.
+
+`print` (and a plain StreamHandler) issue a synchronous write syscall under
+uvicorn, briefly blocking the event loop on every call. Here log records go
+through an unbounded in-memory queue and a QueueListener drains them to
+stdout on a background thread, so the request path only pays the enqueue.
+"""
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+_log_queue: queue.Queue = queue.Queue(-1)
+
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(
+    logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+)
+
+_listener = QueueListener(_log_queue, _stream_handler, respect_handler_level=True)
+_listener.start()
+atexit.register(_listener.stop)
+
+logger = logging.getLogger("ekho")
+logger.setLevel(logging.INFO)
+logger.addHandler(QueueHandler(_log_queue))
+logger.propagate = False
@@ -1,57 +1,122 @@
 from dotenv import load_dotenv
 load_dotenv()  # MUST be first, before any app imports!
 
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import router
 from app.config import get_settings
+from app.http_client import close_http_client
+from app.services.mongodb_service import get_mongodb_service
+from app.services.snowflake_service import get_snowflake_service
+from app.services.storage_service import get_storage_service
+from app.services.veo_service import get_veo_service
+
+STORAGE_PROBE_INTERVAL_SEC = 5
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start loop-bound service tasks on startup, close pools on shutdown."""
+    print("=" * 60)
+    print("🚀 Ekho Backend Starting...")
+    print("=" * 60)
+    print(f"📍 Google Cloud Project: {settings.google_cloud_project}")
+    print(f"📍 Location: {settings.google_cloud_location}")
+    print(f"📍 Storage Bucket: {settings.storage_bucket}")
+    print(f"📍 Environment: {settings.environment}")
+    print("=" * 60)
+
+    # Snowflake setup + analytics flusher run as tasks on this event loop.
+    get_snowflake_service().start()
+
+    # Index creation plus the conversation write flusher, both on this loop.
+    get_mongodb_service().start()
+
+    # Shared Veo job poll sweep (one Vertex call per in-flight job per tick).
+    get_veo_service().start()
+
+    # Probe GCS on a fixed cadence so /health is a memory read instead of a
+    # per-poll upstream call (k8s can probe at several Hz).
+    async def _probe_loop():
+        while True:
+            try:
+                app.state.storage_ok = await get_storage_service().check_connection()
+            except Exception:
+                app.state.storage_ok = False
+            app.state.storage_checked_at = datetime.now(timezone.utc).isoformat()
+            await asyncio.sleep(STORAGE_PROBE_INTERVAL_SEC)
+
+    app.state.storage_ok = False
+    app.state.storage_checked_at = None
+    probe_task = asyncio.create_task(_probe_loop())
+
+    print("✅ Server ready! Visit http://localhost:8000/docs")
+    print("=" * 60)
+
+    yield
+
+    probe_task.cancel()
+
+    await get_veo_service().close()
+    await get_snowflake_service().close()
+    await get_mongodb_service().close()
+    await close_http_client()
+    print("\n👋 Ekho Backend Shutting Down...")
+
+
 app = FastAPI(
     title="Ekho - Your Future Self",
     description="Talk to tomorrow's you, today. Veo 3.1 video avatar generation.",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    # orjson serializes responses several times faster than stdlib json —
+    # noticeable on hot polled endpoints like /video-status.
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
-# CORS middleware
+# CORS middleware. An explicit origin allowlist (instead of "*") lets browsers
+# cache credentialed preflights; max_age keeps them to one OPTIONS per day.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=settings.allowed_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,
 )
 
 # Include API routes
 app.include_router(router)
 
-@app.on_event("startup")
-async def startup_event():
-    """Run on application startup."""
-    print("=" * 60)
-    print("🚀 Ekho Backend Starting...")
-    print("=" * 60)
-    print(f"📍 Google Cloud Project: {settings.google_cloud_project}")
-    print(f"📍 Location: {settings.google_cloud_location}")
-    print(f"📍 Storage Bucket: {settings.storage_bucket}")
-    print(f"📍 Environment: {settings.environment}")
-    print("=" * 60)
-    print("✅ Server ready! Visit http://localhost:8000/docs")
-    print("=" * 60)
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Run on application shutdown."""
-    print("\n👋 Ekho Backend Shutting Down...")
-
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True
-    )
+
+    if settings.environment == "production":
+        # uvloop + httptools are markedly faster than the default
+        # asyncio/h11 stack; workers scale across cores.
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=8000,
+            workers=int(os.getenv("WEB_CONCURRENCY", "4")),
+            loop="uvloop",
+            http="httptools",
+            reload=False,
+        )
+    else:
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True
+        )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from enum import Enum
 
@@ -13,16 +13,10 @@ class VideoGenerationRequest(BaseModel):
     """Request model for video generation."""
     prompt: str = Field(..., min_length=10, max_length=1000)
     duration: int = Field(default=10, ge=5, le=30)
-    reference_images: Optional[List[str]] = None  # Base64 encoded
+    reference_images: Optional[List[str]] = Field(default=None, max_length=5)  # Base64 encoded
     style: VideoStyle = VideoStyle.CONVERSATIONAL
     user_id: str
 
-    @validator('reference_images')
-    def validate_reference_images(cls, v):
-        if v and len(v) > 5:
-            raise ValueError('Maximum 5 reference images allowed')
-        return v
-
 class VideoGenerationResponse(BaseModel):
     """Response model for video generation."""
     job_id: str
@@ -43,22 +37,17 @@ class VideoStatusResponse(BaseModel):
 class AvatarCreationRequest(BaseModel):
     """Request model for avatar creation."""
     user_id: str
-    face_captures: List[str] = Field(..., min_items=3, max_items=5)  # Base64 images
+    face_captures: List[str] = Field(..., min_length=3, max_length=5)  # Base64 images
     voice_sample: Optional[str] = None  # Base64 audio (for future)
     age_progression_years: int = Field(default=5, ge=3, le=10)
 
-    @validator('face_captures')
-    def validate_face_captures(cls, v):
-        if not v or len(v) < 3:
-            raise ValueError('At least 3 face captures required')
-        return v
-
 class HealthCheckResponse(BaseModel):
     """Health check response."""
     status: str
     service: str
     timestamp: str
     google_cloud_connected: bool
+    last_checked_at: Optional[str] = None  # when the background prober last ran
 
 # -------------------------
 # Chat models
@@ -71,11 +60,21 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     text: str
     video_url: Optional[str] = None
-    video_job_id: Optional[str] = None 
+    video_job_id: Optional[str] = None
     audio_url: Optional[str] = None
+    media_job_id: Optional[str] = None  # poll /media-status/{id} for audio/video
     mode: Optional[str] = None
     emotional_tone: Optional[str] = None
 
+class MediaStatusResponse(BaseModel):
+    """Status of background audio/video production for a chat reply."""
+    job_id: str
+    status: str  # "processing", "completed", "failed"
+    audio_url: Optional[str] = None
+    video_job_id: Optional[str] = None
+    error: Optional[str] = None
+    updated_at: str
+
 class CloneVoiceResponse(BaseModel):
     user_id: str
     voice_id: str
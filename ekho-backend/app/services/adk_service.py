@@ -1,18 +1,24 @@
 # app/services/adk_service.py
 import asyncio
 import re
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
-from app.services.mongodb_service import MongoDBService
-from app.services.snowflake_service import SnowflakeService
+from app.services.mongodb_service import get_mongodb_service
+from app.services.snowflake_service import get_snowflake_service
 
-# Very simple keyword screen; improve later if time permits.
-CRISIS_KEYWORDS = {
-    "suicide", "kill myself", "self-harm", "hurt myself",
-    "end it all", "can't go on", "want to die"
-}
+# Very simple keyword screen; improve later if time permits. Compiled into a
+# single alternation so the safety check is one pass over the message instead
+# of one substring scan per keyword.
+_CRISIS_RE = re.compile(
+    r"\b(?:suicide|kill myself|self[- ]harm|hurt myself"
+    r"|end it all|can't go on|want to die)\b",
+    re.I,
+)
 
-# Light heuristics for mode & emotion
+# Light heuristics for mode & emotion. Each mode's patterns are merged and
+# compiled once at import so detect_mode runs one compiled search per mode
+# instead of re-parsing raw pattern strings on every message.
 _MODE_RULES = {
     "therapist": [
         r"\b(anxious|anxiety|panic|overwhelmed|depressed|lonely|burn(?:out|ed)?)\b",
@@ -25,9 +31,42 @@ _MODE_RULES = {
         r"\b(idea|ideas|brainstorm|creativ|how might we|what if)\b",
     ],
 }
+_MODE_RE = {
+    mode: re.compile("(?:" + ")|(?:".join(pats) + ")", re.I)
+    for mode, pats in _MODE_RULES.items()
+}
+
+# Single compiled alternation: one linear scan yields both the positive and
+# negative hit counts, instead of running two regexes over the same string.
+_TONE = re.compile(
+    r"\b(?P<pos>happy|relieved|proud|excited|optimistic|grateful)\b"
+    r"|\b(?P<neg>sad|anxious|stressed|worried|angry|upset|tired|burn(?:ed|out))\b",
+    re.I,
+)
+
 
-_POSITIVE = re.compile(r"\b(happy|relieved|proud|excited|optimistic|grateful)\b", re.I)
-_NEGATIVE = re.compile(r"\b(sad|anxious|stressed|worried|angry|upset|tired|burn(?:ed|out))\b", re.I)
+# Cheap substring prefilter: every _TONE literal contains one of these stems,
+# so a text with no stem can't match and the regex is skipped entirely —
+# which is the common (neutral) case for most chat messages.
+_TONE_STEMS = (
+    "happ", "reliev", "proud", "excit", "optimis", "grate",
+    "sad", "anxi", "stress", "worri", "angr", "upset", "tired", "burn",
+)
+
+
+def _count_tones(text: str):
+    """One pass over the text; returns (positive_hits, negative_hits)."""
+    # Callers often pass pre-folded text; skip the copy when they do.
+    low = text if text.islower() else text.lower()
+    if not any(stem in low for stem in _TONE_STEMS):
+        return 0, 0
+    pos = neg = 0
+    for m in _TONE.finditer(text):
+        if m.lastgroup == "pos":
+            pos += 1
+        else:
+            neg += 1
+    return pos, neg
 
 
 class ADKAgentService:
@@ -42,8 +81,12 @@ class ADKAgentService:
     """
 
     def __init__(self):
-        self.mongo = MongoDBService()
-        self.snow = SnowflakeService()
+        # Shared process-wide clients (same instances the routes use).
+        self.mongo = get_mongodb_service()
+        self.snow = get_snowflake_service()
+        # Strong refs to trend queries that outlive their request deadline
+        # (the loop only keeps weak task refs).
+        self._bg_trends: set = set()
 
     # -------------------------
     # Agents
@@ -59,13 +102,26 @@ class ADKAgentService:
         try:
             if not getattr(self.snow, "conn", None):
                 return []
-            return await self.snow.analyze_emotional_trends(user_id) or []
+            # Chat latency is max(branches); a slow Snowflake query must not
+            # be the branch that sets it. The deadline is enforced without
+            # cancelling the query: cancellation would land inside _run and
+            # release the shared-cursor lock while the worker thread is still
+            # on the cursor. Shielded, the query runs to completion and fills
+            # the trend cache for the next turn; we just stop waiting.
+            task = asyncio.ensure_future(
+                self.snow.analyze_emotional_trends(user_id)
+            )
+            self._bg_trends.add(task)
+            task.add_done_callback(self._bg_trends.discard)
+            try:
+                return await asyncio.wait_for(asyncio.shield(task), timeout=0.5) or []
+            except asyncio.TimeoutError:
+                return []
         except Exception:
             return []
 
     async def safety_agent(self, message: str) -> Dict[str, Any]:
-        msg = (message or "").lower()
-        crisis = any(k in msg for k in CRISIS_KEYWORDS)
+        crisis = bool(_CRISIS_RE.search(message or ""))
         return {"crisis": crisis, "note": "Crisis language detected." if crisis else "clear"}
 
     # -------------------------
@@ -73,26 +129,25 @@ class ADKAgentService:
     # -------------------------
     def detect_mode(self, message: str) -> str:
         text = (message or "")
-        for mode, patterns in _MODE_RULES.items():
-            for pat in patterns:
-                if re.search(pat, text, flags=re.I):
-                    return mode
+        for mode, rx in _MODE_RE.items():
+            if rx.search(text):
+                return mode
         return "casual"
 
     def tag_emotion(self, text: str) -> str:
         if not text:
             return "neutral"
-        if _NEGATIVE.search(text):
+        pos, neg = _count_tones(text)
+        if neg:
             return "anxious"
-        if _POSITIVE.search(text):
+        if pos:
             return "positive"
         return "neutral"
 
     def quick_sentiment_score(self, text: str) -> float:
         if not text:
             return 0.0
-        pos = len(_POSITIVE.findall(text))
-        neg = len(_NEGATIVE.findall(text))
+        pos, neg = _count_tones(text)
         if pos == neg == 0:
             return 0.0
         return (pos - neg) / max(1, (pos + neg))
@@ -103,15 +158,44 @@ class ADKAgentService:
     async def orchestrate(self, user_id: str, user_message: str) -> Dict[str, Any]:
         """
         Runs all agents AND fetches user profile data in parallel for context.
+        On a crisis hit the memory/trends branches are cancelled — the crisis
+        response path doesn't use them, so there's no reason to wait on the
+        slowest branch.
         """
-        # 1. Gather all tasks concurrently: agents + profile data
-        mem, trends, safety, profile = await asyncio.gather(
-            self.memory_agent(user_id, user_message),
-            self.pattern_agent(user_id),
-            self.safety_agent(user_message),
-            self.mongo.get_user_profile(user_id), # <-- NEW: Fetch user profile
+        # Fold the message once; every classifier downstream is
+        # case-insensitive, so they all share this copy.
+        msg_lower = (user_message or "").casefold()
+
+        # 1. Start all branches concurrently: agents + profile data
+        mem_task = asyncio.create_task(self.memory_agent(user_id, user_message))
+        trends_task = asyncio.create_task(self.pattern_agent(user_id))
+        profile_task = asyncio.create_task(
+            self.mongo.get_user_profile_cached(user_id)  # TTL-cached
+        )
+
+        # Safety is a pure in-process check — resolve it first and shed the
+        # I/O branches if it trips.
+        safety = await self.safety_agent(msg_lower)
+        if safety.get("crisis"):
+            mem_task.cancel()
+            trends_task.cancel()
+            try:
+                profile = await profile_task
+            except Exception:
+                profile = None
+            return {
+                "memories": [],
+                "trends": [],
+                "safety": safety,
+                "suggested_mode": "therapist",
+                "voice_id": profile.get("voice_id") if profile else None,
+                "avatar_reference_urls": profile.get("avatar_reference_urls", []) if profile else [],
+            }
+
+        mem, trends, profile = await asyncio.gather(
+            mem_task, trends_task, profile_task
         )
-        
+
         # 2. Extract essential fields needed by routes.py
         voice_id = profile.get("voice_id") if profile else None
         avatar_refs = profile.get("avatar_reference_urls", []) if profile else []
@@ -121,7 +205,7 @@ class ADKAgentService:
             "memories": mem or [],
             "trends": trends or [],
             "safety": safety,
-            "suggested_mode": self.detect_mode(user_message),
+            "suggested_mode": self.detect_mode(msg_lower),
             "voice_id": voice_id,                   # <-- NOW AVAILABLE to routes.py
             "avatar_reference_urls": avatar_refs,   # <-- NOW AVAILABLE to routes.py
         }
@@ -167,3 +251,9 @@ class ADKAgentService:
         return {"emotional_tag": emotion, "sentiment_score": sentiment, "mode": mode_final}
 
 
+
+
+@lru_cache(maxsize=1)
+def get_adk_service() -> ADKAgentService:
+    """Process-wide ADK orchestrator."""
+    return ADKAgentService()
@@ -1,31 +1,50 @@
 # app/services/elevenlabs_service.py
+# The ElevenLabs SDK is imported lazily on first use: it's a heavyweight
+# import that only TTS/clone paths need, and deferring it keeps worker
+# cold-start and fork RSS down.
 
-from elevenlabs.client import ElevenLabs
-from elevenlabs import VoiceSettings
 from io import BytesIO
+from functools import lru_cache
+from typing import AsyncIterator
 import asyncio
+import threading
 from app.config import get_settings
+from app.log import logger
 from app.services.voice_analysis import get_best_matching_default_voice_from_audio
 
 class ElevenLabsService:
     def __init__(self):
         settings = get_settings()
         if not settings.elevenlabs_api_key:
-            print("❌ ERROR: ELEVENLABS_API_KEY not set!")
+            logger.error("ELEVENLABS_API_KEY not set!")
             raise ValueError("ELEVENLABS_API_KEY not set")
-            
-        self.client = ElevenLabs(api_key=settings.elevenlabs_api_key)
-        print("✅ ElevenLabs Service initialized.")
 
-    async def clone_voice(self, audio_data: bytes, user_id: str) -> str:
+        self._api_key = settings.elevenlabs_api_key
+        self._client = None
+        logger.info("ElevenLabs Service initialized.")
+
+    @property
+    def client(self):
+        """SDK client, built (and its import paid) on first use."""
+        if self._client is None:
+            from elevenlabs.client import ElevenLabs
+            self._client = ElevenLabs(api_key=self._api_key)
+        return self._client
+
+    async def clone_voice(self, audio_data, user_id: str) -> str:
         """
         Attempts to clone a user's voice. If cloning fails (e.g., subscription restriction),
         falls back to a default voice.
+        Accepts raw bytes or a binary file-like object (read from the start).
         Returns a voice_id string.
         """
         try:
-            audio_file = BytesIO(audio_data)
-            
+            if isinstance(audio_data, (bytes, bytearray)):
+                audio_file = BytesIO(audio_data)
+            else:
+                audio_file = audio_data
+                audio_file.seek(0)
+
             # Try Instant Voice Cloning (IVC)
             voice = await asyncio.to_thread(
                 self.client.voices.ivc.create,
@@ -34,24 +53,24 @@ class ElevenLabsService:
                 files=[audio_file]
             )
             
-            print(f"✅ Cloned voice for user {user_id}. Voice ID: {voice.voice_id}")
+            logger.info("Cloned voice for user %s. Voice ID: %s", user_id, voice.voice_id)
             return voice.voice_id
         
         except Exception as e:
             # Detect subscription restriction specifically
             msg = str(e).lower()
             if "can_not_use_instant_voice_cloning" in msg or "subscription" in msg:
-                print(f"⚠️ Cannot clone voice for user {user_id}: {e}")
+                logger.warning("Cannot clone voice for user %s: %s", user_id, e)
                 # --- Call the voice matching function from voice_analysis.py ---
                 voice_id = await get_best_matching_default_voice_from_audio(
                     client=self.client,
                     audio_data=audio_data
                 )
-                print(f"➡️ Using closest default voice ID: {voice_id}")
+                logger.info("Using closest default voice ID: %s", voice_id)
                 return voice_id
             else:
                 # Raise other exceptions
-                print(f"❌ Failed to clone voice for user {user_id}: {e}")
+                logger.exception("Failed to clone voice for user %s", user_id)
                 raise
 
     def get_default_voice_id(self) -> str:
@@ -76,6 +95,8 @@ class ElevenLabsService:
         Synchronous helper for audio generation.
         """
         try:
+            from elevenlabs import VoiceSettings
+
             voice_settings = VoiceSettings(
                 stability=0.35,
                 similarity_boost=0.75,
@@ -91,13 +112,17 @@ class ElevenLabsService:
                 voice_settings=voice_settings
             )
 
-            # This call also blocks
-            audio_bytes = b"".join(chunk for chunk in audio_chunks)
-            
-            print(f"Generated speech for voice_id {voice_id}")
-            return audio_bytes
+            # Accumulate straight into a bytearray: one pass over the chunk
+            # stream, no intermediate list or generator frame for join().
+            buf = bytearray()
+            ext = buf.extend
+            for chunk in audio_chunks:
+                ext(chunk)
+
+            logger.info("Generated speech for voice_id %s", voice_id)
+            return bytes(buf)
         except Exception as e:
-            print(f"❌ Failed to generate speech for voice_id {voice_id}: {e}")
+            logger.exception("Failed to generate speech for voice_id %s", voice_id)
             raise
 
     async def generate_speech(self, text: str, voice_id: str) -> bytes:
@@ -110,4 +135,69 @@ class ElevenLabsService:
             self._generate_speech_sync,
             text,
             voice_id
-        )
\ No newline at end of file
+        )
+
+    async def stream_speech(self, text: str, voice_id: str) -> AsyncIterator[bytes]:
+        """
+        Converts text to speech and yields audio chunks as they arrive, so a
+        StreamingResponse can start playback after the first chunk instead of
+        after the whole clip. The blocking SDK iterator runs in a worker
+        thread and hands chunks over through a queue.
+
+        Not wired to an endpoint yet: the chat route returns full clips via
+        generate_speech because the frontend player needs a complete file.
+        This is kept for the planned streaming playback path.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=64)
+        loop = asyncio.get_running_loop()
+        _DONE = object()
+        # Set when the consumer goes away (client disconnect / early exit) so
+        # the worker thread stops instead of producing chunks nobody reads.
+        stop = threading.Event()
+
+        def _produce():
+            try:
+                from elevenlabs import VoiceSettings
+
+                voice_settings = VoiceSettings(
+                    stability=0.35,
+                    similarity_boost=0.75,
+                    style=0.2,
+                    use_speaker_boost=True
+                )
+                for chunk in self.client.text_to_speech.convert(
+                    voice_id=voice_id,
+                    text=text,
+                    model_id="eleven_multilingual_v2",
+                    voice_settings=voice_settings
+                ):
+                    if stop.is_set():
+                        return
+                    asyncio.run_coroutine_threadsafe(queue.put(chunk), loop).result()
+                asyncio.run_coroutine_threadsafe(queue.put(_DONE), loop).result()
+            except Exception as e:
+                asyncio.run_coroutine_threadsafe(queue.put(e), loop).result()
+
+        producer = asyncio.create_task(asyncio.to_thread(_produce))
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    logger.exception("Failed to stream speech for voice_id %s", voice_id)
+                    raise item
+                yield item
+        finally:
+            # On early exit the worker may be parked in a put() on the full
+            # queue, where it can't see the stop flag — drain the queue to
+            # unblock it before waiting for the thread to finish.
+            stop.set()
+            while not queue.empty():
+                queue.get_nowait()
+            await producer
+
+@lru_cache(maxsize=1)
+def get_elevenlabs_service() -> ElevenLabsService:
+    """Process-wide ElevenLabs service (one SDK client)."""
+    return ElevenLabsService()
@@ -1,13 +1,22 @@
 # app/services/gemini_service.py
 import os
-import asyncio  # <-- 1. IMPORT ASYNCIO
+import asyncio
+from functools import lru_cache  # <-- 1. IMPORT ASYNCIO
 from app.config import get_settings
+from app.log import logger
 
 try:
     import google.generativeai as genai  # type: ignore
 except Exception:
     genai = None
 
+# Static prompt header, interned once at import — generate() only pays for
+# the two small concatenations that actually vary per turn.
+_PROMPT_HEADER = (
+    "You are {name}, speaking to your past self from 5 years in the future. "
+    "Warm, concise, supportive. Ask one gentle follow-up question.\n\n"
+)
+
 class GeminiService:
     def __init__(self):
         settings = get_settings()
@@ -21,9 +30,9 @@ class GeminiService:
                 # --- 2. UPDATED MODEL NAME ---
                 self.model = genai.GenerativeModel("gemini-2.5-flash-preview-09-2025")
                 self.enabled = True
-                print("✅ Gemini initialized")
+                logger.info("Gemini initialized")
             except Exception as e:
-                print("⚠️ Gemini init failed:", e)
+                logger.warning("Gemini init failed: %s", e)
 
     # --- 3. CREATE A SYNC HELPER ---
     def _generate_sync(self, prompt: str) -> str:
@@ -36,7 +45,7 @@ class GeminiService:
             text = getattr(resp, "text", None)
             return (text or "(no response)").strip()
         except Exception as e:
-            print("⚠️ Gemini call failed:", e)
+            logger.exception("Gemini call failed")
             return "I’m here. What part worries you most?"
 
     # --- 4. MAKE THE MAIN METHOD ASYNC ---
@@ -45,14 +54,16 @@ class GeminiService:
         Return a text reply. This method NEVER raises; it returns a stub if SDK/key fail.
         Now runs non-blocking.
         """
-        prompt = (
-            f"You are {user_name}, speaking to your past self from 5 years in the future. "
-            "Warm, concise, supportive. Ask one gentle follow-up question.\n\n"
-            f"User: {user_message}"
-        )
+        prompt = _PROMPT_HEADER.format(name=user_name) + "User: " + user_message
 
         if not self.enabled:
              return f"(stub) Future {user_name}: '{user_message}' — tell me more."
 
         # --- 5. RUN THE BLOCKING CALL IN A THREAD ---
         return await asyncio.to_thread(self._generate_sync, prompt)
+
+
+@lru_cache(maxsize=1)
+def get_gemini_service() -> "GeminiService":
+    """Process-wide Gemini service (one configured model)."""
+    return GeminiService()
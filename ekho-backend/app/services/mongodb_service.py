@@ -1,5 +1,9 @@
+import asyncio
+from functools import lru_cache
+from cachetools import TTLCache
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.config import get_settings
+from app.log import logger
 from datetime import datetime, timezone
 
 class MongoDBService:
@@ -10,11 +14,55 @@ class MongoDBService:
         settings = get_settings()
         self.client = AsyncIOMotorClient(settings.mongodb_uri)
         self.db = self.client.ekho  # 'ekho' is the database name
-        
+
         self.users_collection = self.db.users
         self.conversations_collection = self.db.conversations
-        
-        print("✅ MongoDB connection initialized.")
+
+        # Profiles change rarely; a short TTL cache turns most per-chat
+        # profile reads into a dict lookup. Invalidated on profile writes.
+        self._profile_cache = TTLCache(maxsize=10_000, ttl=60)
+
+        # Conversation docs are buffered and flushed by a background task as
+        # one insert_many per batch, same shape as the Snowflake flusher.
+        self._write_queue: asyncio.Queue = asyncio.Queue(maxsize=10_000)
+        self._flush_batch_size = 100
+        self._flush_interval_sec = 0.5
+        self._started = False
+        # Strong refs to the loop-bound tasks: the event loop only keeps
+        # weak ones, so an unreferenced flusher can be garbage-collected
+        # mid-flight. Also lets close() cancel them cleanly.
+        self._tasks: list[asyncio.Task] = []
+
+        logger.info("MongoDB connection initialized.")
+
+    def start(self):
+        """
+        Create the loop-bound startup tasks (index creation + conversation
+        flusher). Called from the app lifespan; idempotent.
+        """
+        if self._started:
+            return
+        self._started = True
+        self._tasks = [
+            asyncio.create_task(self.ensure_indexes()),
+            asyncio.create_task(self._flush_loop()),
+        ]
+
+    async def ensure_indexes(self):
+        """
+        Create the indexes the hot queries rely on. Called from the app
+        lifespan (create_index needs a running loop); idempotent on Mongo's
+        side.
+        """
+        try:
+            await self.conversations_collection.create_index(
+                [("user_id", 1), ("timestamp", -1)]
+            )
+            # Profile lookups and upserts key on user_id; unique keeps the
+            # upsert path from ever racing into duplicate profiles.
+            await self.users_collection.create_index("user_id", unique=True)
+        except Exception:
+            logger.exception("Failed to ensure MongoDB indexes")
 
     async def save_conversation(
         self,
@@ -25,38 +73,87 @@ class MongoDBService:
         mode: str
     ):
         """
-        Save conversation to database.
+        Queue a conversation document for the background batch flusher.
+        The chat response doesn't depend on this write, so the caller only
+        pays a queue put; the flusher amortizes the insert over a batch.
         """
+        doc = {
+            "user_id": user_id,
+            "user_message": user_message,
+            "ai_response": ai_response,
+            "emotional_tag": emotional_tag,
+            "mode": mode,
+            "timestamp": datetime.now(timezone.utc)
+        }
         try:
-            await self.conversations_collection.insert_one({
-                "user_id": user_id,
-                "user_message": user_message,
-                "ai_response": ai_response,
-                "emotional_tag": emotional_tag,
-                "mode": mode,
-                "timestamp": datetime.now(timezone.utc)
-            })
-            print(f"Saved conversation for user {user_id}")
-        except Exception as e:
-            print(f"❌ Failed to save conversation: {e}")
+            self._write_queue.put_nowait(doc)
+        except asyncio.QueueFull:
+            logger.warning("Conversation write queue full; dropping document.")
+
+    async def _flush_loop(self):
+        """
+        Background task: drain queued conversation docs and write each batch
+        with a single unordered insert_many.
+        """
+        while True:
+            docs = [await self._write_queue.get()]
+            deadline = asyncio.get_event_loop().time() + self._flush_interval_sec
+            while len(docs) < self._flush_batch_size:
+                timeout = deadline - asyncio.get_event_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    docs.append(
+                        await asyncio.wait_for(self._write_queue.get(), timeout)
+                    )
+                except asyncio.TimeoutError:
+                    break
+            await self._flush_docs(docs)
+
+    async def _flush_docs(self, docs):
+        """Insert a batch of conversation docs in one round trip."""
+        if not docs:
+            return
+        try:
+            await self.conversations_collection.insert_many(docs, ordered=False)
+            logger.info("Flushed %d conversation docs to MongoDB.", len(docs))
+        except Exception:
+            logger.exception("Failed to flush conversation batch")
+
+    # Callers only consume these fields; projecting them server-side trims
+    # the bytes on the wire and the BSON decode per document.
+    _HISTORY_PROJECTION = {
+        "_id": 0,
+        "user_message": 1,
+        "ai_response": 1,
+        "emotional_tag": 1,
+        "mode": 1,
+        "timestamp": 1,
+    }
 
     async def get_conversation_history(
         self,
         user_id: str,
-        limit: int = 50
+        limit: int = 50,
+        projection: dict | None = None,
     ):
         """
         Retrieve recent conversations for a user.
         """
         try:
-            cursor = self.conversations_collection.find(
-                {"user_id": user_id}
-            ).sort("timestamp", -1).limit(limit)
-            
-            history = await cursor.to_list(length=limit)
-            return list(reversed(history))
+            # Take the N newest on the server, then flip back to ascending
+            # there too — no client-side reversal pass or temp list.
+            pipeline = [
+                {"$match": {"user_id": user_id}},
+                {"$sort": {"timestamp": -1}},
+                {"$limit": limit},
+                {"$sort": {"timestamp": 1}},
+                {"$project": projection or self._HISTORY_PROJECTION},
+            ]
+            cursor = self.conversations_collection.aggregate(pipeline)
+            return await cursor.to_list(length=limit)
         except Exception as e:
-            print(f"❌ Failed to retrieve conversation history: {e}")
+            logger.exception("Failed to retrieve conversation history")
             return []
 
     async def get_user_profile(self, user_id: str):
@@ -66,9 +163,22 @@ class MongoDBService:
         try:
             return await self.users_collection.find_one({"user_id": user_id})
         except Exception as e:
-            print(f"❌ Failed to get user profile: {e}")
+            logger.exception("Failed to get user profile")
             return None
 
+    async def get_user_profile_cached(self, user_id: str):
+        """
+        get_user_profile behind a 60s TTL cache. Use on read-heavy paths
+        (chat) where slightly stale voice_id/avatar refs are acceptable.
+        """
+        try:
+            return self._profile_cache[user_id]
+        except KeyError:
+            profile = await self.get_user_profile(user_id)
+            if profile is not None:
+                self._profile_cache[user_id] = profile
+            return profile
+
     # --- NEW FUNCTION ---
     async def update_user_profile(self, user_id: str, updates: dict):
         """
@@ -81,6 +191,29 @@ class MongoDBService:
                 {"$set": updates},
                 upsert=True  
             )
-            print(f"Updated profile for user {user_id} with: {list(updates.keys())}")
+            self._profile_cache.pop(user_id, None)  # drop stale cached profile
+            logger.info("Updated profile for user %s with: %s", user_id, list(updates.keys()))
         except Exception as e:
-            print(f"❌ Failed to update user profile {user_id}: {e}")
\ No newline at end of file
+            logger.exception("Failed to update user profile %s", user_id)
+
+    async def close(self):
+        """Stop the flusher, flush pending docs, then close the Motor client."""
+        # Cancel the background tasks first so the flusher can't race the
+        # final drain or touch the client after it closes.
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        pending = []
+        while not self._write_queue.empty():
+            pending.append(self._write_queue.get_nowait())
+        await self._flush_docs(pending)
+        self.client.close()
+        logger.info("MongoDB connection closed.")
+
+
+@lru_cache(maxsize=1)
+def get_mongodb_service() -> MongoDBService:
+    """Process-wide MongoDB service (one Motor client / connection pool)."""
+    return MongoDBService()
\ No newline at end of file
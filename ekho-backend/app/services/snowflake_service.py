@@ -1,9 +1,13 @@
-import snowflake.connector
+# snowflake.connector is imported lazily in _connect(): it drags in pyarrow
+# and cryptography (~tens of MB / ~200ms), which workers that never log
+# analytics shouldn't pay at import.
+from functools import lru_cache
 from app.config import get_settings
-from datetime import datetime, timezone
 import asyncio
 from typing import Dict, Any
 
+from cachetools import TTLCache
+
 class SnowflakeService:
     def __init__(self):
         """
@@ -11,9 +15,43 @@ class SnowflakeService:
         """
         self.settings = get_settings()
         self.conn = None
+        # One long-lived cursor shared by all statements (guarded by a lock —
+        # Snowflake cursors aren't safe for concurrent use) instead of a
+        # fresh cursor allocation per call.
+        self._cursor = None
+        self._cursor_lock = asyncio.Lock()
+        # Conversation analytics are buffered here and flushed in batches by a
+        # background task, so the request path only pays a queue put. Bounded
+        # so a Snowflake outage can't grow the buffer without limit.
+        self._analytics_queue: asyncio.Queue = asyncio.Queue(maxsize=10_000)
+        self._flush_batch_size = 1000
+        self._flush_interval_sec = 2.0
+        self._started = False
+        # Strong refs to the loop-bound tasks: the event loop only keeps
+        # weak ones, so an unreferenced flusher can be garbage-collected
+        # mid-flight. Also lets close() cancel them cleanly.
+        self._tasks: list = []
+        # The 30-day trend aggregate changes one row per chat turn; a short
+        # TTL keeps repeat pattern-agent calls off the warehouse entirely.
+        self._trend_cache = TTLCache(maxsize=4096, ttl=60)
+        # Materialized views need Enterprise edition; when creating the daily
+        # roll-up fails, trend queries fall back to aggregating the raw table.
+        self._daily_view_ok = False
         print("Snowflake Service initialized (but not connected).")
-        # Run setup in a non-blocking way
-        asyncio.create_task(self._setup_tables())
+
+    def start(self):
+        """
+        Kick off table setup and the analytics flusher. Called from the app
+        lifespan so the tasks are created on the running event loop instead
+        of at import time. Idempotent.
+        """
+        if self._started:
+            return
+        self._started = True
+        self._tasks = [
+            asyncio.create_task(self._setup_tables()),
+            asyncio.create_task(self._flush_loop()),
+        ]
 
 
     async def _setup_tables(self):
@@ -24,8 +62,7 @@ class SnowflakeService:
         await self._ensure_connected()
         try:
             # --- 1. CONVERSATIONS TABLE ---
-            await asyncio.to_thread(
-                self.conn.cursor().execute,
+            await self._run(
                 """
                 CREATE TABLE IF NOT EXISTS EKHO_DB.ANALYTICS.conversations (
                     user_id STRING,
@@ -36,10 +73,9 @@ class SnowflakeService:
                 );
                 """
             )
-            
+
             # --- 2. NEW VOICE ANALYTICS TABLE ---
-            await asyncio.to_thread(
-                self.conn.cursor().execute,
+            await self._run(
                 """
                 CREATE TABLE IF NOT EXISTS EKHO_DB.ANALYTICS.voice_analytics (
                     user_id STRING,
@@ -57,6 +93,35 @@ class SnowflakeService:
         except Exception as e:
             print(f"❌ Failed to create/verify Snowflake tables: {e}")
             self.conn = None # Force reconnect
+            self._cursor = None
+            return
+
+        # --- 3. DAILY ROLL-UP FOR TREND QUERIES ---
+        # The trend endpoint reads this instead of scanning raw
+        # conversations: O(days) rows per user instead of O(rows).
+        # Materialized views are an Enterprise-edition feature, so this is
+        # allowed to fail without taking the connection down: trend queries
+        # just aggregate the raw table instead.
+        try:
+            await self._run(
+                """
+                CREATE MATERIALIZED VIEW IF NOT EXISTS
+                EKHO_DB.ANALYTICS.conversations_daily AS
+                SELECT
+                    user_id,
+                    DATE(timestamp) AS date,
+                    AVG(sentiment_score) AS avg_emotion,
+                    COUNT(*) AS conversation_count
+                FROM EKHO_DB.ANALYTICS.conversations
+                GROUP BY user_id, DATE(timestamp);
+                """
+            )
+            self._daily_view_ok = True
+        except Exception as e:
+            print(
+                f"⚠️ conversations_daily unavailable ({e}); "
+                "trend queries will aggregate the raw table."
+            )
 
     async def _connect(self):
         """
@@ -65,9 +130,11 @@ class SnowflakeService:
         if self.conn:
             return  # Already connected
 
+        import snowflake.connector as sfc
+
         try:
             self.conn = await asyncio.to_thread(
-                snowflake.connector.connect,
+                sfc.connect,
                 user=self.settings.snowflake_user,
                 password=self.settings.snowflake_password,
                 account=self.settings.snowflake_account,
@@ -75,11 +142,13 @@ class SnowflakeService:
                 schema='ANALYTICS',
                 autocommit=True
             )
-            await asyncio.to_thread(self.conn.cursor().execute, "USE WAREHOUSE EKHO_WH")
+            self._cursor = await asyncio.to_thread(self.conn.cursor)
+            await asyncio.to_thread(self._cursor.execute, "USE WAREHOUSE EKHO_WH")
             print("✅ Snowflake connection successful and warehouse set.")
         except Exception as e:
             print(f"❌ Failed to connect to Snowflake: {e}")
             self.conn = None
+            self._cursor = None
 
     async def _ensure_connected(self):
         """Ensures a valid connection exists before running a query."""
@@ -88,41 +157,86 @@ class SnowflakeService:
         if not self.conn:
             raise Exception("Snowflake connection is not established.")
 
+    async def _run(self, query, params=None, fetch=False):
+        """Execute a statement on the shared cursor (serialized by the lock)."""
+        async with self._cursor_lock:
+            def _exec():
+                self._cursor.execute(query, params)
+                return self._cursor.fetchall() if fetch else None
+            return await asyncio.to_thread(_exec)
+
+    async def _run_many(self, query, rows):
+        """executemany on the shared cursor (serialized by the lock)."""
+        async with self._cursor_lock:
+            await asyncio.to_thread(self._cursor.executemany, query, rows)
+
     async def log_conversation_analytic(
-        self, 
-        user_id: str, 
+        self,
+        user_id: str,
         emotional_tag: str,
         conversation_mode: str,
         sentiment_score: float
     ):
         """
-        Insert aggregated conversation data into Snowflake (non-blocking).
+        Enqueue conversation data for the background batch flusher.
+        Single-row INSERTs are Snowflake's worst case, so rows are buffered
+        and written in batches instead of one statement per chat.
         """
-        await self._ensure_connected() # Ensure connection is active
-        
+        try:
+            # No timestamp: the column's DEFAULT CURRENT_TIMESTAMP() fills it
+            # in, saving a datetime allocation and a bind per row.
+            self._analytics_queue.put_nowait((
+                user_id,
+                emotional_tag,
+                conversation_mode,
+                sentiment_score,
+            ))
+        except asyncio.QueueFull:
+            # Analytics are best-effort: drop rather than block the caller.
+            print("⚠️ Analytics queue full; dropping conversation row.")
+
+    async def _flush_loop(self):
+        """
+        Background task: drain queued analytic rows and insert them in batches
+        (up to _flush_batch_size rows or _flush_interval_sec seconds per batch).
+        """
+        while True:
+            # Block until at least one row arrives, then give the batch a
+            # short window to fill up before writing.
+            rows = [await self._analytics_queue.get()]
+            deadline = asyncio.get_event_loop().time() + self._flush_interval_sec
+            while len(rows) < self._flush_batch_size:
+                timeout = deadline - asyncio.get_event_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    rows.append(
+                        await asyncio.wait_for(self._analytics_queue.get(), timeout)
+                    )
+                except asyncio.TimeoutError:
+                    break
+            await self._flush_rows(rows)
+
+    async def _flush_rows(self, rows):
+        """Write a batch of analytic rows with a single multi-row insert."""
+        if not rows:
+            return
         query = """
-        INSERT INTO conversations 
-        (user_id, emotional_tag, conversation_mode, sentiment_score, timestamp)
-        VALUES (%s, %s, %s, %s, %s)
+        INSERT INTO conversations
+        (user_id, emotional_tag, conversation_mode, sentiment_score)
+        VALUES (%s, %s, %s, %s)
         """
         try:
-            # Run the blocking DB call in a thread
-            await asyncio.to_thread(
-                self.conn.cursor().execute,
-                query,
-                (
-                    user_id,
-                    emotional_tag,
-                    conversation_mode,
-                    sentiment_score,
-                    datetime.now(timezone.utc)
-                )
-            )
-            print(f"Logged analytic for user {user_id} to Snowflake.")
+            await self._ensure_connected()
+            # executemany uses the connector's array binding, so the whole
+            # batch goes over in one statement.
+            await self._run_many(query, rows)
+            print(f"Flushed {len(rows)} analytic rows to Snowflake.")
         except Exception as e:
-            print(f"❌ Failed to insert analytic into Snowflake: {e}")
+            print(f"❌ Failed to flush analytics batch into Snowflake: {e}")
             self.conn = None # Force reconnect on next call
-    
+            self._cursor = None
+
     # --- NEW FUNCTION FOR VOICE ANALYSIS ---
     async def log_voice_analytic(
         self, 
@@ -137,13 +251,12 @@ class SnowflakeService:
         
         query = """
         INSERT INTO voice_analytics
-        (user_id, pitch_mean_hz, speech_rate_bpm, pause_frequency_hz, 
-         volume_variance, duration_sec, tag, timestamp)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        (user_id, pitch_mean_hz, speech_rate_bpm, pause_frequency_hz,
+         volume_variance, duration_sec, tag)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
         """
         try:
-            await asyncio.to_thread(
-                self.conn.cursor().execute,
+            await self._run(
                 query,
                 (
                     user_id,
@@ -153,47 +266,78 @@ class SnowflakeService:
                     features.get("volume_variance", 0.0),
                     features.get("duration_sec", 0.0),
                     tag,
-                    datetime.now(timezone.utc)
                 )
             )
             print(f"Logged voice analytic for user {user_id} to Snowflake.")
         except Exception as e:
             print(f"❌ Failed to insert voice analytic into Snowflake: {e}")
             self.conn = None # Force reconnect on next call
+            self._cursor = None
 
     async def analyze_emotional_trends(self, user_id: str):
         """
-        Get 30-day emotional trend for a user (non-blocking).
+        Get 30-day emotional trend for a user (non-blocking, 60s-cached).
         """
+        try:
+            return self._trend_cache[user_id]
+        except KeyError:
+            pass
+
         await self._ensure_connected()
 
-        query = """
-        SELECT
-            DATE(timestamp) as date,
-            AVG(sentiment_score) as avg_emotion,
-            COUNT(*) as conversation_count
-        FROM conversations
-        WHERE user_id = %s
-        AND timestamp >= DATEADD(day, -30, CURRENT_DATE())
-        GROUP BY DATE(timestamp)
-        ORDER BY date
-        """
-        
+        if self._daily_view_ok:
+            query = """
+            SELECT date, avg_emotion, conversation_count
+            FROM conversations_daily
+            WHERE user_id = %s
+            AND date >= DATEADD(day, -30, CURRENT_DATE())
+            ORDER BY date
+            """
+        else:
+            # No materialized view on this edition: aggregate the raw table
+            # inline. Slower, but the 60s cache keeps repeat calls cheap.
+            query = """
+            SELECT
+                DATE(timestamp) AS date,
+                AVG(sentiment_score) AS avg_emotion,
+                COUNT(*) AS conversation_count
+            FROM conversations
+            WHERE user_id = %s
+            AND timestamp >= DATEADD(day, -30, CURRENT_TIMESTAMP())
+            GROUP BY DATE(timestamp)
+            ORDER BY date
+            """
+
         try:
-            # Run blocking cursor and fetchall in a thread
-            def _run_query():
-                cursor = self.conn.cursor()
-                cursor.execute(query, (user_id,))
-                return cursor.fetchall()
+            rows = await self._run(query, (user_id,), fetch=True)
+            self._trend_cache[user_id] = rows
+            return rows
 
-            return await asyncio.to_thread(_run_query)
-        
         except Exception as e:
             print(f"❌ Failed to analyze emotional trends: {e}")
             self.conn = None
+            self._cursor = None
             return []
 
     async def close(self):
+        # Stop the background tasks first: a live _flush_loop picking up a
+        # late row after close would reconnect through _ensure_connected.
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Drain any analytic rows still waiting in the queue before closing.
+        pending = []
+        while not self._analytics_queue.empty():
+            pending.append(self._analytics_queue.get_nowait())
+        await self._flush_rows(pending)
         if self.conn:
             await asyncio.to_thread(self.conn.close)
-            print("Snowflake connection closed.")
\ No newline at end of file
+            print("Snowflake connection closed.")
+
+
+@lru_cache(maxsize=1)
+def get_snowflake_service() -> SnowflakeService:
+    """Process-wide Snowflake service (one connection + analytics queue)."""
+    return SnowflakeService()
\ No newline at end of file
@@ -1,17 +1,31 @@
 import os
 import base64
-import logging
+import time
+
+from app.log import logger
+
+try:
+    # SIMD-accelerated base64 (AVX2/NEON); same API as the stdlib module.
+    import pybase64 as _b64
+except Exception:
+    _b64 = base64
+
+try:
+    # C/SIMD CRC32C — pinned explicitly so the slow pure-Python fallback
+    # inside google-resumable-media is never silently selected.
+    import google_crc32c as _crc32c
+except Exception:
+    _crc32c = None
+from functools import lru_cache
 from typing import List
 from datetime import timedelta
 import asyncio
 
+from cachetools import LRUCache, TTLCache
+from google.auth.transport.requests import AuthorizedSession
 from google.cloud import storage
 from google.oauth2 import service_account
-
-# Use print instead of logger to match your other files
-# logging.basicConfig(level=logging.INFO)
-# logger = logging.getLogger(__name__)
-
+from requests.adapters import HTTPAdapter
 
 class StorageService:
     """Service for handling Google Cloud Storage operations."""
@@ -24,41 +38,137 @@ class StorageService:
         creds_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
         if creds_path and os.path.exists(creds_path):
             credentials = service_account.Credentials.from_service_account_file(
-                creds_path
+                creds_path,
+                scopes=["https://www.googleapis.com/auth/cloud-platform"],
             )
-            self.client = storage.Client(credentials=credentials)
-            print(
-                f"✅ StorageService: using explicit service account at {creds_path}"
+            # Pooled keep-alive transport: concurrent uploads/deletes reuse
+            # warm TLS connections instead of handshaking per request.
+            session = AuthorizedSession(credentials)
+            adapter = HTTPAdapter(
+                pool_connections=32, pool_maxsize=64, max_retries=3
+            )
+            session.mount("https://", adapter)
+            self.client = storage.Client(credentials=credentials, _http=session)
+            logger.info(
+                "StorageService: using explicit service account at %s", creds_path
             )
         else:
             self.client = storage.Client()
-            print("✅ StorageService: using default application credentials")
+            logger.info("StorageService: using default application credentials")
 
         self.bucket_name = bucket_name
         self.bucket = self.client.bucket(bucket_name)
-        print(f"✅ StorageService: initialized for bucket {bucket_name}")
+        # Signing is CPU-bound (RSA) and deterministic per object, so cache
+        # URLs for slightly less than their 1h lifetime.
+        self._signed_url_cache = TTLCache(maxsize=50_000, ttl=55 * 60)
+        # Bucket handles for foreign-bucket gs:// URIs (e.g. Veo outputs).
+        self._buckets = {}
+        # Blob handles for repeat read-side operations (signing) keyed by
+        # (bucket, object). Bounded LRU rather than lru_cache on a method —
+        # entries must be evictable when cleanup deletes the objects.
+        self._blobs = LRUCache(maxsize=10_000)
+        # Keep references to fire-and-forget upload tasks so they aren't GC'd.
+        self._bg_uploads = set()
+        # Cap concurrent upload threads: enough to overlap RTTs, not enough
+        # to fan out an unbounded thread-per-image burst.
+        self._upload_sem = asyncio.Semaphore(
+            int(os.getenv("GCS_UPLOAD_CONCURRENCY", "12"))
+        )
+        # Last successful bucket probe (monotonic); recent success short-
+        # circuits the GET-bucket RPC, failures force the next real probe.
+        self._last_ok = 0.0
+        self._probe_ttl_sec = 30.0
+        logger.info("StorageService: initialized for bucket %s", bucket_name)
+
+    def invalidate_connection(self):
+        """Force the next connection check to really probe the bucket."""
+        self._last_ok = 0.0
 
     def _check_connection_sync(self) -> bool:
         """Blocking helper for check_connection."""
+        if time.monotonic() - self._last_ok < self._probe_ttl_sec:
+            return True
         try:
             self.client.get_bucket(self.bucket_name)
+            self._last_ok = time.monotonic()
             return True
         except Exception as e:
-            print(f"❌ StorageService connection check failed: {e}")
+            logger.warning("StorageService connection check failed: %s", e)
             return False
 
     async def check_connection(self) -> bool:
         """Check if storage bucket is accessible."""
         return await asyncio.to_thread(self._check_connection_sync)
 
-    def _upload_blob_sync(self, image_data: bytes, object_name: str, content_type: str) -> str:
-        """Blocking helper for uploading."""
+    @staticmethod
+    def _precompute_crc32c(blob, data: bytes):
+        """
+        Pre-set the blob's CRC32C from the C extension so the upload ships a
+        server-verified checksum without the client recomputing it in Python.
+        """
+        if _crc32c is not None:
+            checksum = _crc32c.Checksum()
+            checksum.update(data)
+            blob.crc32c = base64.b64encode(checksum.digest()).decode()
+
+    def _upload_blob_sync(
+        self, image_data: bytes, object_name: str, content_type: str,
+        ephemeral: bool = False,
+    ) -> str:
+        """
+        Blocking helper for uploading. Ephemeral blobs (short-lived reference
+        images deleted after the job) skip the CRC32C pass entirely; durable
+        blobs ship the precomputed checksum.
+        """
         blob = self.bucket.blob(object_name)
-        blob.upload_from_string(image_data, content_type=content_type)
+        blob.chunk_size = self._choose_chunk_size(len(image_data))
+        if ephemeral:
+            blob.upload_from_string(
+                image_data, content_type=content_type, checksum=None
+            )
+        else:
+            self._precompute_crc32c(blob, image_data)
+            blob.upload_from_string(image_data, content_type=content_type)
         gcs_uri = f"gs://{self.bucket_name}/{object_name}"
-        print(f"Uploaded to {gcs_uri}")
+        logger.info("Uploaded to %s", gcs_uri)
         return gcs_uri
 
+    async def _bounded_upload(
+        self, image_data: bytes, object_name: str, content_type: str,
+        ephemeral: bool = False,
+    ) -> str:
+        """Semaphore-bounded wrapper around the blocking upload helper."""
+        async with self._upload_sem:
+            return await asyncio.to_thread(
+                self._upload_blob_sync, image_data, object_name, content_type,
+                ephemeral,
+            )
+
+    async def _decode_and_upload(
+        self, idx: int, image_b64: str, user_id: str, job_id: str
+    ) -> str:
+        """
+        Full per-image pipeline: parse the data-URL header, decode the
+        payload off-loop, then upload through the bounded semaphore. Each
+        image runs as its own task, so image N+1 decodes (CPU) while image
+        N uploads (network).
+        """
+        if image_b64.startswith("data:image"):
+            header, b64data = image_b64.split(",", 1)
+            content_type = "image/png" if "png" in header else "image/jpeg"
+            ext = "png" if "png" in header else "jpg"
+        else:
+            b64data = image_b64
+            content_type = "image/jpeg"
+            ext = "jpg"
+
+        # Decode off-loop: multi-MB captures otherwise stall the event loop.
+        image_data = await asyncio.to_thread(_b64.b64decode, b64data)
+        object_name = f"reference/{user_id}/{job_id}/face_{idx}.{ext}"
+        return await self._bounded_upload(
+            image_data, object_name, content_type, ephemeral=True
+        )
+
     async def upload_reference_images(
         self,
         user_id: str,
@@ -67,50 +177,63 @@ class StorageService:
     ) -> List[str]:
         """
         Accepts base64 data URLs, uploads to GCS, returns gs:// URIs.
-        Now fully non-blocking.
+        Decode and upload stages overlap across images (bounded by the
+        semaphore); one failed image is logged and skipped rather than
+        cancelling its siblings.
         """
+        tasks = [
+            self._decode_and_upload(idx, image_b64, user_id, job_id)
+            for idx, image_b64 in enumerate(face_captures)
+            if image_b64
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
         uris: List[str] = []
-        upload_tasks = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("Error decoding/uploading reference image: %s", result)
+            else:
+                uris.append(result)
+        return uris
 
-        for idx, image_b64 in enumerate(face_captures):
-            if not image_b64:
-                continue
+    # Below this size a single non-chunked PUT beats a resumable session
+    # (per-chunk commits are the classic GCS slow path); above it, large
+    # 32MiB chunks keep the commit count low while allowing per-chunk retry.
+    _SINGLE_SHOT_MAX = 100 * 1024 * 1024
+    _RESUMABLE_CHUNK_SIZE = 32 * 1024 * 1024
 
-            # ... (same base64 decoding logic as your file) ...
-            if image_b64.startswith("data:image"):
-                header, b64data = image_b64.split(",", 1)
-                content_type = "image/png" if "png" in header else "image/jpeg"
-                ext = "png" if "png" in header else "jpg"
-            else:
-                b64data = image_b64
-                content_type = "image/jpeg"
-                ext = "jpg"
+    @classmethod
+    def _choose_chunk_size(cls, size: int):
+        """None (single-shot upload) for known-size payloads under 100MiB."""
+        return None if size < cls._SINGLE_SHOT_MAX else cls._RESUMABLE_CHUNK_SIZE
 
-            try:
-                image_data = base64.b64decode(b64data)
-            except Exception as e:
-                print(f"❌ Error decoding base64 for image {idx}: {e}")
-                continue
-
-            object_name = f"reference/{user_id}/{job_id}/face_{idx}.{ext}"
-            
-            # Add the async task to a list to run in parallel
-            upload_tasks.append(
-                asyncio.to_thread(
-                    self._upload_blob_sync,
-                    image_data,
-                    object_name,
-                    content_type
-                )
-            )
+    def _upload_audio_sync(self, audio_bytes: bytes, object_name: str, content_type: str) -> str:
+        """Blocking helper for audio uploads."""
+        blob = self.bucket.blob(object_name)
+        blob.cache_control = "private, max-age=3600"
+        blob.chunk_size = self._choose_chunk_size(len(audio_bytes))
+        self._precompute_crc32c(blob, audio_bytes)
+        blob.upload_from_string(audio_bytes, content_type=content_type)
+        gcs_uri = f"gs://{self.bucket_name}/{object_name}"
+        logger.info(
+            "Uploaded audio to %s (%s)",
+            gcs_uri,
+            "single-shot" if blob.chunk_size is None else "resumable",
+        )
+        return gcs_uri
 
-        # Run all uploads concurrently
+    async def upload_audio(self, audio_bytes: bytes, gcs_path: str, content_type: str = "audio/mpeg") -> str:
+        """Upload TTS audio; chunked/resumable for larger clips, non-blocking."""
         try:
-            uris = await asyncio.gather(*upload_tasks)
+            return await asyncio.to_thread(
+                self._upload_audio_sync,
+                audio_bytes,
+                gcs_path,
+                content_type
+            )
         except Exception as e:
-            print(f"❌ Error uploading images to GCS: {e}")
-
-        return uris
+            logger.exception("Error uploading audio to %s", gcs_path)
+            self.invalidate_connection()
+            raise
 
     async def upload_file_bytes(self, file_bytes: bytes, gcs_path: str, content_type: str):
         """Helper to upload raw bytes (like audio)"""
@@ -122,21 +245,73 @@ class StorageService:
                 content_type
             )
         except Exception as e:
-            print(f"❌ Error uploading file bytes to {gcs_path}: {e}")
+            logger.exception("Error uploading file bytes to %s", gcs_path)
+            self.invalidate_connection()
             raise
     
+    def _cleanup_sync(self, user_id: str, job_id: str) -> int:
+        """
+        Blocking helper: delete a job's temp reference blobs with one batched
+        request (up to 100 deletes per HTTP round trip) instead of a DELETE
+        per blob.
+        """
+        prefix = f"reference/{user_id}/{job_id}/"
+        blobs = list(self.client.list_blobs(self.bucket_name, prefix=prefix))
+        if not blobs:
+            return 0
+        with self.client.batch():
+            for blob in blobs:
+                blob.delete()
+        # Drop any cached handles for the deleted objects.
+        for blob in blobs:
+            self._blobs.pop((self.bucket_name, blob.name), None)
+        logger.info("Deleted %d temp blobs under %s", len(blobs), prefix)
+        return len(blobs)
+
+    async def cleanup_temp_files(self, user_id: str, job_id: str) -> int:
+        """Delete a job's uploaded reference images; non-blocking, best-effort."""
+        try:
+            return await asyncio.to_thread(self._cleanup_sync, user_id, job_id)
+        except Exception as e:
+            logger.exception("Error cleaning up temp files for job %s", job_id)
+            return 0
+
+    _GS_PREFIX = "gs://"
+
+    def _bucket_for(self, bucket_name: str):
+        """Reuse Bucket handles instead of re-allocating one per signed URL."""
+        if bucket_name == self.bucket_name:
+            return self.bucket
+        bucket = self._buckets.get(bucket_name)
+        if bucket is None:
+            bucket = self._buckets[bucket_name] = self.client.bucket(bucket_name)
+        return bucket
+
+    def _blob_for(self, bucket_name: str, blob_name: str):
+        """
+        Reuse Blob handles for read-side operations (signing). Upload paths
+        keep allocating fresh blobs — they mutate per-call state like
+        chunk_size and crc32c that must not leak between requests.
+        """
+        key = (bucket_name, blob_name)
+        blob = self._blobs.get(key)
+        if blob is None:
+            blob = self._blobs[key] = self._bucket_for(bucket_name).blob(blob_name)
+        return blob
+
     def _get_signed_url_sync(self, gcs_uri: str, expires_seconds: int) -> str:
         """Blocking helper for get_signed_url."""
-        if not gcs_uri.startswith("gs://"):
+        if not gcs_uri.startswith(self._GS_PREFIX):
             return gcs_uri
 
-        without = gcs_uri[len("gs://"):]
-        parts = without.split("/", 1)
-        if len(parts) != 2:
+        # Single find + two slices; no intermediate list from split().
+        slash = gcs_uri.find("/", len(self._GS_PREFIX))
+        if slash == -1:
             return gcs_uri
 
-        bucket_name, blob_name = parts
-        blob = self.client.bucket(bucket_name).blob(blob_name)
+        bucket_name = gcs_uri[len(self._GS_PREFIX):slash]
+        blob_name = gcs_uri[slash + 1:]
+        blob = self._blob_for(bucket_name, blob_name)
 
         return blob.generate_signed_url(
             version="v4",
@@ -147,10 +322,49 @@ class StorageService:
     async def get_signed_url(self, gcs_uri: str, expires_seconds: int = 3600) -> str:
         """
         Turn gs://bucket/path.mp4 into a time-limited HTTPS URL.
-        Now fully non-blocking.
+        Cached per URI; non-blocking on miss.
         """
-        return await asyncio.to_thread(
-            self._get_signed_url_sync,
-            gcs_uri,
-            expires_seconds
+        cache_key = (gcs_uri, expires_seconds)
+        try:
+            return self._signed_url_cache[cache_key]
+        except KeyError:
+            url = await asyncio.to_thread(
+                self._get_signed_url_sync,
+                gcs_uri,
+                expires_seconds
+            )
+            self._signed_url_cache[cache_key] = url
+            return url
+
+    async def upload_and_sign(
+        self,
+        file_bytes: bytes,
+        gcs_path: str,
+        content_type: str = "audio/mpeg",
+        expires_seconds: int = 3600,
+    ) -> str:
+        """
+        Start the upload and sign the URL concurrently. V4 signing is pure
+        local CPU and doesn't need the object to exist yet, so the signed URL
+        is returned as soon as it's computed while the upload finishes in the
+        background.
+        """
+        async def _upload():
+            try:
+                await self.upload_audio(file_bytes, gcs_path, content_type)
+            except Exception as e:
+                logger.exception("Background upload failed for %s", gcs_path)
+
+        task = asyncio.create_task(_upload())
+        self._bg_uploads.add(task)
+        task.add_done_callback(self._bg_uploads.discard)
+
+        return await self.get_signed_url(
+            f"gs://{self.bucket_name}/{gcs_path}", expires_seconds
         )
+
+
+@lru_cache(maxsize=1)
+def get_storage_service() -> StorageService:
+    """Process-wide storage service (one GCS client)."""
+    return StorageService()
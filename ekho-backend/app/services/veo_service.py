@@ -1,26 +1,41 @@
+import asyncio
 import os
-import uuid
-import logging
+import random
+import secrets
+import time
+from collections import defaultdict
 from datetime import datetime, timezone # <-- IMPORT TIMEZONE
 from typing import List, Dict
 
 import httpx
+import orjson
+from cachetools import TTLCache
+from functools import lru_cache
 from google.oauth2 import service_account
 from google.auth.transport.requests import Request
 
-from app.services.storage_service import StorageService
+# app.services.storage_service is imported lazily in __init__: it pulls in
+# google-cloud-storage, which is slow to import and unneeded by consumers
+# that never construct the service.
+from app.config import get_settings
+from app.http_client import get_http_client
+from app.log import logger
 
-# Use print instead of logger
-# logging.basicConfig(level=logging.INFO)
-# logger = logging.getLogger(__name__)
+_VIDEO_EXTS = (".mp4", ".mov", ".webm", ".mkv")
 
-storage_service = StorageService()
+_MIME_BY_EXT = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+}
 
 def guess_mime(uri: str) -> str:
-    u = uri.lower()
-    if u.endswith(".png"):
-        return "image/png"
-    return "image/jpeg"
+    # Lowercase only the extension, not a copy of the whole URI.
+    i = uri.rfind(".")
+    if i < 0:
+        return "image/jpeg"
+    return _MIME_BY_EXT.get(uri[i:].lower(), "image/jpeg")
 
 
 class VeoServiceREST:
@@ -33,12 +48,43 @@ class VeoServiceREST:
     """
 
     def __init__(self, project_id: str, location: str,
-                 model_id: str, output_storage_uri: str):
+                 model_id: str, output_storage_uri: str,
+                 storage=None):
+        # Shared process-wide storage client (injectable for tests).
+        if storage is None:
+            from app.services.storage_service import get_storage_service
+            storage = get_storage_service()
+        self.storage = storage
         self.project_id = project_id
         self.location = location
         self.model_id = model_id
         self.output_storage_uri = output_storage_uri.rstrip("/") + "/"
-        self.jobs: Dict[str, Dict] = {}
+        # Job records, evicted 24h after last touch so a long-running process
+        # doesn't accumulate every job ever submitted. Still in-process: the
+        # service runs as a single deployment, and signed video URLs expire
+        # on the same timescale anyway.
+        self.jobs: Dict[str, Dict] = TTLCache(
+            maxsize=int(os.getenv("VEO_JOB_CACHE_SIZE", "10000")),
+            ttl=int(os.getenv("VEO_JOB_TTL", "86400")),
+        )
+        # user_id -> job_ids, so listing a user's jobs doesn't scan every
+        # job in the store. Entries whose jobs have aged out of self.jobs
+        # are pruned lazily on read (TTLCache has no eviction hook).
+        self._by_user: Dict[str, List[str]] = defaultdict(list)
+        # Cached bearer token + its expiry (monotonic). Tokens last ~1h, so
+        # the poll path normally skips the google-auth validity machinery
+        # entirely and just returns the string.
+        self._token: str | None = None
+        self._token_exp: float = 0.0
+        self._token_lock = asyncio.Lock()
+        self._headers: Dict | None = None
+        # One shared sweep refreshes all in-flight jobs instead of a Vertex
+        # call per polling client; see _poll_loop.
+        self.poll_interval = 2.0
+        self._started = False
+        # Strong ref: the loop only keeps weak refs to tasks, and a
+        # collected sweep would silently stop all job refreshes.
+        self._poll_task: asyncio.Task | None = None
 
         sa_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
         if not sa_path or not os.path.exists(sa_path):
@@ -50,15 +96,56 @@ class VeoServiceREST:
             sa_path,
             scopes=["https://www.googleapis.com/auth/cloud-platform"],
         )
-        print(f"✅ VeoServiceREST: using service account from {sa_path}")
+
+        # Endpoint URLs never change for the life of the instance; build
+        # them once instead of re-assembling the f-string per call.
+        base = (
+            f"https://{location}-aiplatform.googleapis.com/v1/"
+            f"projects/{project_id}/locations/{location}"
+            f"/publishers/google/models/{model_id}"
+        )
+        self._predict_url = base + ":predictLongRunning"
+        self._fetch_url = base + ":fetchPredictOperation"
+        logger.info("VeoServiceREST: using service account from %s", sa_path)
 
     # ---------- Auth ----------
 
-    def get_access_token(self) -> str:
-        """Synchronous token fetch/refresh."""
-        if not self.credentials.valid:
-            self.credentials.refresh(Request())
-        return self.credentials.token
+    async def get_access_token(self) -> str:
+        """
+        Return the cached bearer token, refreshing when <60s remain. The
+        refresh is a blocking HTTPS round trip, so it runs in a thread, and
+        the lock makes concurrent polls share one refresh instead of each
+        firing their own.
+        """
+        if time.monotonic() < self._token_exp - 60:
+            return self._token
+        async with self._token_lock:
+            # Another coroutine may have refreshed while we waited.
+            if time.monotonic() < self._token_exp - 60:
+                return self._token
+            if not self.credentials.valid:
+                await asyncio.to_thread(self.credentials.refresh, Request())
+            self._token = self.credentials.token
+            remaining = 0.0
+            if self.credentials.expiry:
+                # google-auth expiry is a naive UTC datetime.
+                remaining = (
+                    self.credentials.expiry
+                    - datetime.now(timezone.utc).replace(tzinfo=None)
+                ).total_seconds()
+            self._token_exp = time.monotonic() + max(0.0, remaining)
+            return self._token
+
+    async def _auth_headers(self) -> Dict:
+        """Request headers, rebuilt only when the bearer token rotates."""
+        token = await self.get_access_token()
+        headers = self._headers
+        if headers is None or headers["Authorization"][7:] != token:
+            headers = self._headers = {
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json; charset=utf-8",
+            }
+        return headers
 
     # ---------- Public APIs used by your routes ----------
 
@@ -118,7 +205,9 @@ class VeoServiceREST:
         face_captures: List[str],
         duration_seconds: int,
     ) -> Dict:
-        job_id = f"veo_{user_id}_{uuid.uuid4().hex[:8]}"
+        # token_hex(4) produces the same 8 hex chars as uuid4().hex[:8]
+        # without building a UUID object and a 32-char string first.
+        job_id = f"veo_{user_id}_{secrets.token_hex(4)}"
         now = datetime.now(timezone.utc).isoformat()
         
         # --- FIX START: Conditional Handling for GCS URIs vs Base64 ---
@@ -135,13 +224,17 @@ class VeoServiceREST:
             if is_gcs_uris:
                 # Case 1: Input is GCS URIs (from ADK/MongoDB for /chat)
                 gcs_uris = face_captures[:3]
-                print(f"[{job_id}] Skipping upload. Using {len(gcs_uris)} existing GCS URIs from profile.")
+                logger.info(
+                    "[%s] Skipping upload. Using %d existing GCS URIs from profile.",
+                    job_id, len(gcs_uris),
+                )
             else:
                 # Case 2: Input is Base64 (from /generate-avatar)
-                print(
-                    f"[{job_id}] Uploading {len(face_captures[:3])} reference images for {user_id}"
+                logger.info(
+                    "[%s] Uploading %d reference images for %s",
+                    job_id, len(face_captures[:3]), user_id,
                 )
-                gcs_uris = await storage_service.upload_reference_images(
+                gcs_uris = await self.storage.upload_reference_images(
                     user_id=user_id,
                     face_captures=face_captures[:3],
                     job_id=job_id,
@@ -151,7 +244,7 @@ class VeoServiceREST:
                 raise RuntimeError("No valid reference images were found or uploaded.")
         # --- FIX END ---
 
-            print(f"[{job_id}] GCS URIs: {gcs_uris}")
+            logger.info("[%s] GCS URIs: %s", job_id, gcs_uris)
 
             output_prefix = f"{self.output_storage_uri}{job_id}/"
 
@@ -195,13 +288,14 @@ class VeoServiceREST:
                 "gcs_uris": gcs_uris,
             }
             self.jobs[job_id] = job
+            self._by_user[user_id].append(job_id)
 
-            print(f"[{job_id}] Submitted Veo job: {operation_name}")
+            logger.info("[%s] Submitted Veo job: %s", job_id, operation_name)
             return job
 
         except Exception as e:
-            print(
-                f"❌ [{job_id}] Job creation failed: {type(e).__name__}: {e}"
+            logger.error(
+                "[%s] Job creation failed: %s: %s", job_id, type(e).__name__, e
             )
             err = {
                 "job_id": job_id,
@@ -212,18 +306,71 @@ class VeoServiceREST:
                 "video_url": None,
                 "error": str(e),
                 "created_at": now,
-                "updated_at": datetime.now(timezone.utc).isoformat(), # <-- USE TIMEZONE
+                "updated_at": now,
             }
             self.jobs[job_id] = err
+            self._by_user[user_id].append(job_id)
             return err
 
     # ---------- Status APIs ----------
 
+    def start(self):
+        """
+        Start the shared poll sweep. Called from the app lifespan so the task
+        lands on the running event loop. Idempotent.
+        """
+        if self._started:
+            return
+        self._started = True
+        self._poll_task = asyncio.create_task(self._poll_loop())
+
+    async def close(self):
+        """Cancel the poll sweep. Called from the app lifespan on shutdown."""
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            try:
+                await self._poll_task
+            except asyncio.CancelledError:
+                pass
+            self._poll_task = None
+        self._started = False
+
+    async def _poll_loop(self):
+        """
+        Single background sweep: every poll_interval seconds, refresh every
+        job still in flight. N clients polling /video-status then read the
+        cached record instead of each triggering its own Vertex round trip.
+        """
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            now = time.monotonic()
+            active = [
+                job for job in list(self.jobs.values())
+                if job.get("status") in ("submitted", "processing")
+                and now >= job.get("next_poll_at", 0.0)
+            ]
+            if not active:
+                continue
+            await asyncio.gather(
+                *(self._refresh_job(job) for job in active),
+                return_exceptions=True,
+            )
+
     async def get_job_status(self, job_id: str) -> Dict:
         job = self.jobs.get(job_id)
         if not job:
             raise ValueError(f"Job {job_id} not found")
 
+        # With the sweep running, status reads are pure memory lookups; the
+        # inline refresh only remains for script use without the app lifespan.
+        if self._started or job.get("status") not in ("submitted", "processing"):
+            return job
+        if time.monotonic() < job.get("next_poll_at", 0.0):
+            return job
+        return await self._refresh_job(job)
+
+    async def _refresh_job(self, job: Dict) -> Dict:
+        job_id = job["job_id"]
         op_name = job.get("operation")
         if not op_name:
             return job
@@ -231,24 +378,45 @@ class VeoServiceREST:
         try:
             op = await self._fetch_predict_operation(op_name)
         except Exception as e:
-            print(
-                f"❌ [{job_id}] fetchPredictOperation failed: {type(e).__name__}: {e}"
+            logger.error(
+                "[%s] fetchPredictOperation failed: %s: %s",
+                job_id, type(e).__name__, e,
             )
-            job["status"] = "error"
+            # A failed fetch says nothing about the operation itself — it may
+            # still complete. Keep the job in flight (with the error recorded
+            # and backoff applied) so the sweep retries it, instead of
+            # marking it terminal on one 429 or transport-error burst.
+            job["status"] = "processing"
             job["error"] = str(e)
             job["updated_at"] = datetime.now(timezone.utc).isoformat() # <-- USE TIMEZONE
+            job["poll_count"] = job.get("poll_count", 0) + 1
+            job["next_poll_at"] = time.monotonic() + min(
+                15.0, self.poll_interval * 2 ** (job["poll_count"] - 1)
+            )
             return job
 
         job["updated_at"] = datetime.now(timezone.utc).isoformat() # <-- USE TIMEZONE
 
-        print(f"[{job_id}] fetchPredictOperation response: {op}")
+        # Debug level: repr-ing the full operation dict on every poll is
+        # wasted work unless someone is actually tracing.
+        logger.debug("[%s] fetchPredictOperation response: %s", job_id, op)
 
-        # Still running
+        # Still running: back off before the next fetch. Generation takes
+        # tens of seconds, so the early "not done" fetches are guaranteed
+        # waste — 2s, 4s, 8s, then capped at 15s between Vertex calls.
         if not op.get("done"):
             job["status"] = "processing"
+            job["error"] = None  # clear any recorded fetch failure
             job.setdefault("progress", 10)
+            job["poll_count"] = job.get("poll_count", 0) + 1
+            job["next_poll_at"] = time.monotonic() + min(
+                15.0, self.poll_interval * 2 ** (job["poll_count"] - 1)
+            )
             return job
 
+        job.pop("next_poll_at", None)
+        job.pop("poll_count", None)
+
         # Done with error
         if "error" in op and op["error"]:
             job["status"] = "failed"
@@ -277,96 +445,167 @@ class VeoServiceREST:
                 or v0.get("videoUri")
             )
         if not video_uri:
-            video_uri = self._find_any_video_url(resp) or self._find_any_video_url(op)
+            # op contains resp, so one traversal covers both.
+            video_uri = self._find_any_video_url(op)
 
         
         # --- CRITICAL FIX: Use 'await' for the async get_signed_url ---
         if video_uri and video_uri.startswith("gs://"):
-            video_uri = await storage_service.get_signed_url(video_uri)
+            video_uri = await self.storage.get_signed_url(video_uri)
         # --- END FIX ---
 
         job["video_url"] = video_uri
-        print(
-            f"[{job_id}] Operation done. status={job['status']}, video_url={job.get('video_url')}"
+        logger.info(
+            "[%s] Operation done. status=%s, video_url=%s",
+            job_id, job["status"], job.get("video_url"),
         )
 
-        job.setdefault("error", None)
+        job["error"] = None
         return job
 
-    def list_user_jobs(self, user_id: str) -> List[Dict]:
-        return [j for j in self.jobs.values() if j.get("user_id") == user_id]
+    def list_user_jobs(
+        self, user_id: str, limit: int = 50, cursor: str | None = None
+    ) -> Dict:
+        """
+        Page through a user's jobs (newest first) via a created_at cursor,
+        so page cost stays bounded no matter how much history a user has.
+        Returns the page plus a next_cursor (None on the last page).
+        """
+        job_ids = self._by_user.get(user_id, [])
+        jobs = []
+        alive = []
+        for jid in job_ids:
+            job = self.jobs.get(jid)
+            if job is not None:
+                alive.append(jid)
+                jobs.append(job)
+        if len(alive) != len(job_ids):
+            self._by_user[user_id] = alive
+
+        matches = [
+            j for j in jobs
+            if cursor is None or j.get("created_at", "") < cursor
+        ]
+        matches.sort(key=lambda j: j.get("created_at", ""), reverse=True)
+        page = matches[:limit]
+        return {
+            "jobs": page,
+            "next_cursor": (
+                page[-1].get("created_at")
+                if page and len(matches) > limit
+                else None
+            ),
+        }
 
     # ---------- Helpers ----------
-    def _find_any_video_url(self, data) -> str | None:
-        # ... (same recursive logic as your file) ...
-        if isinstance(data, dict):
-            for _, v in data.items():
-                if isinstance(v, str):
-                    if (v.startswith("gs://") or v.startswith("http")) and any(
-                        ext in v for ext in (".mp4", ".mov", ".webm", ".mkv")
-                    ):
-                        return v
-                found = self._find_any_video_url(v)
-                if found:
-                    return found
-        elif isinstance(data, list):
-            for item in data:
-                found = self._find_any_video_url(item)
-                if found:
-                    return found
+    @staticmethod
+    def _find_any_video_url(data) -> str | None:
+        """
+        Iterative walk of the operation payload for anything that looks like
+        a video URL; each node is visited once, no recursive call per level.
+        """
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                if (node.startswith("gs://") or node.startswith("http")) and any(
+                    ext in node for ext in _VIDEO_EXTS
+                ):
+                    return node
+            elif isinstance(node, dict):
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
         return None
 
     # ---------- Internal HTTP ----------
     # This section is already async using httpx, so it's good.
 
+    _RETRY_ATTEMPTS = 3
+    _RETRY_STATUSES = (500, 502, 503, 504)
+
+    async def _post_with_retry(self, url: str, content: bytes, timeout: int):
+        """
+        POST with retry on transport errors and transient 5xx responses:
+        up to 3 attempts, exponential backoff with jitter (~1s, ~2s). One
+        dropped keep-alive connection shouldn't fail a whole user job.
+        """
+        last_exc = None
+        for attempt in range(self._RETRY_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(
+                    min(10.0, 2 ** (attempt - 1)) * (1 + random.random())
+                )
+            try:
+                resp = await get_http_client().post(
+                    url,
+                    headers=await self._auth_headers(),
+                    content=content,
+                    timeout=timeout,
+                )
+            except httpx.TransportError as e:
+                last_exc = e
+                logger.warning(
+                    "Veo POST transport error (attempt %d): %s", attempt + 1, e
+                )
+                continue
+            if resp.status_code in self._RETRY_STATUSES:
+                last_exc = httpx.HTTPStatusError(
+                    f"Server error {resp.status_code}",
+                    request=resp.request,
+                    response=resp,
+                )
+                logger.warning(
+                    "Veo POST got %d (attempt %d)", resp.status_code, attempt + 1
+                )
+                continue
+            return resp
+        raise last_exc
+
     async def _call_predict_long_running(self, json_body: Dict) -> str:
-        token = self.get_access_token()
-        url = (
-            f"https://{self.location}-aiplatform.googleapis.com/v1/"
-            f"projects/{self.project_id}/locations/{self.location}"
-            f"/publishers/google/models/{self.model_id}:predictLongRunning"
+        # Shared pooled client: connections to Vertex are reused across calls.
+        # orjson encodes/decodes the payloads a few times faster than the
+        # stdlib json that httpx would use.
+        resp = await self._post_with_retry(
+            self._predict_url, orjson.dumps(json_body), timeout=60
         )
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json; charset=utf-8",
-        }
-
-        async with httpx.AsyncClient(timeout=60) as client:
-            resp = await client.post(url, headers=headers, json=json_body)
 
         if resp.status_code != 200:
-            print(
-                f"❌ Veo predictLongRunning error {resp.status_code}: {resp.text}"
+            logger.error(
+                "Veo predictLongRunning error %d: %s", resp.status_code, resp.text
             )
             resp.raise_for_status()
 
-        data = resp.json()
+        data = orjson.loads(resp.content)
         op_name = data.get("name")
         if not op_name:
             raise RuntimeError(f"No operation name returned from Veo: {data}")
         return op_name
 
     async def _fetch_predict_operation(self, operation_name: str) -> Dict:
-        token = self.get_access_token()
-        url = (
-            f"https://{self.location}-aiplatform.googleapis.com/v1/"
-            f"projects/{self.project_id}/locations/{self.location}"
-            f"/publishers/google/models/{self.model_id}:fetchPredictOperation"
-        )
         body = {"operationName": operation_name}
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json; charset=utf-8",
-        }
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(url, headers=headers, json=body)
+        resp = await self._post_with_retry(
+            self._fetch_url, orjson.dumps(body), timeout=30
+        )
 
         if resp.status_code != 200:
-            print(
-                f"❌ Veo fetchPredictOperation error {resp.status_code}: {resp.text}"
+            logger.error(
+                "Veo fetchPredictOperation error %d: %s", resp.status_code, resp.text
             )
             resp.raise_for_status()
 
-        return resp.json()
+        return orjson.loads(resp.content)
+
+
+@lru_cache(maxsize=1)
+def get_veo_service() -> VeoServiceREST:
+    """Process-wide Veo service built from settings."""
+    settings = get_settings()
+    return VeoServiceREST(
+        project_id=settings.google_cloud_project,
+        location=settings.google_cloud_location,
+        model_id="veo-3.1-generate-preview",
+        output_storage_uri=f"gs://{settings.storage_bucket}/video-outputs/",
+    )
 
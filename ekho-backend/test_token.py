@@ -1,11 +1,27 @@
 import google.auth
 from google.auth.transport.requests import Request
 
+# Cached so repeated calls (e.g. from another script's loop) reuse the
+# warm credentials instead of re-running ADC discovery every time.
+_creds = None
+_project = None
+
+
+def get_credentials():
+    global _creds, _project
+    if _creds is None:
+        _creds, _project = google.auth.default(
+            scopes=["https://www.googleapis.com/auth/cloud-platform"]
+        )
+    # Tokens last ~1h; only hit the metadata server / token endpoint when
+    # the cached one has actually lapsed.
+    if not _creds.valid:
+        _creds.refresh(Request())
+    return _creds, _project
+
+
 def main():
-    creds, project = google.auth.default(
-        scopes=["https://www.googleapis.com/auth/cloud-platform"]
-    )
-    creds.refresh(Request())
+    creds, project = get_credentials()
     print("Project from ADC:", project)
     print("Got access token (first 40 chars):", creds.token[:40])
 
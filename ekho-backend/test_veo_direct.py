@@ -1,7 +1,20 @@
-import os
 import requests
-from google.oauth2 import service_account
-from google.auth.transport.requests import Request
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from _auth import SERVICE_ACCOUNT_FILE, get_token
+
+# Shared session: the predict call and any follow-up reuse one pooled TLS
+# connection, and transient 5xx responses are retried with backoff.
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+    ),
+)
 
 PROJECT_ID = "ekho-477607"
 LOCATION = "us-central1"
@@ -11,20 +24,6 @@ MODEL_ID = "veo-3.1-generate-preview"
 TEST_REF = "gs://ekho-avatars-ekho-477607/test/test.jpg"
 OUT_URI = "gs://ekho-avatars-ekho-477607/output/test-direct/"
 
-SERVICE_ACCOUNT_FILE = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS") or r"C:\Users\Vexo4\Documents\ekho-app\ekho-backend\service-account.json"
-
-
-def get_token():
-    if not os.path.exists(SERVICE_ACCOUNT_FILE):
-        raise FileNotFoundError(f"Service account file not found at: {SERVICE_ACCOUNT_FILE}")
-
-    creds = service_account.Credentials.from_service_account_file(
-        SERVICE_ACCOUNT_FILE,
-        scopes=["https://www.googleapis.com/auth/cloud-platform"],
-    )
-    creds.refresh(Request())
-    return creds.token
-
 
 def main():
     print(f"Using service account file: {SERVICE_ACCOUNT_FILE}")
@@ -61,7 +60,7 @@ def main():
         }
     }
 
-    resp = requests.post(
+    resp = SESSION.post(
         url,
         headers={
             "Authorization": f"Bearer {token}",
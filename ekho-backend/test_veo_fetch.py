@@ -1,11 +1,11 @@
-import os
 import time
 import json
 import requests
-from google.oauth2 import service_account
-from google.auth.transport.requests import Request
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from _auth import get_token
 
-SERVICE_ACCOUNT_FILE = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS") or r"C:\Users\Vexo4\Documents\ekho-app\ekho-backend\service-account.json"
 PROJECT_ID = "ekho-477607"
 LOCATION = "us-central1"
 MODEL_ID = "veo-3.1-generate-preview"
@@ -13,16 +13,18 @@ MODEL_ID = "veo-3.1-generate-preview"
 # paste your operation name here to test
 OPERATION_NAME = "projects/ekho-477607/locations/us-central1/publishers/google/models/veo-3.1-generate-preview/operations/4358c99c-eecf-49c5-9b08-77e021f0bed3"
 
-
-def get_token():
-    if not os.path.exists(SERVICE_ACCOUNT_FILE):
-        raise FileNotFoundError(f"Service account file not found at: {SERVICE_ACCOUNT_FILE}")
-    creds = service_account.Credentials.from_service_account_file(
-        SERVICE_ACCOUNT_FILE,
-        scopes=["https://www.googleapis.com/auth/cloud-platform"],
-    )
-    creds.refresh(Request())
-    return creds.token
+# One session for the whole poll loop so the TLS handshake to the Vertex
+# frontend happens once, not once per poll; transient 5xx retries happen
+# inside the adapter instead of surfacing as a failed poll.
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+    ),
+)
 
 
 def fetch_operation():
@@ -34,7 +36,7 @@ def fetch_operation():
     )
     body = { "operationName": OPERATION_NAME }
 
-    r = requests.post(
+    r = SESSION.post(
         url,
         headers={
             "Authorization": f"Bearer {token}",
@@ -50,6 +52,7 @@ def fetch_operation():
 
 
 def main():
+    delay = 10
     while True:
         data = fetch_operation()
         if not data:
@@ -60,8 +63,11 @@ def main():
             print(json.dumps(data, indent=2)[:6000])
             break
 
-        print("Not done yet, waiting 10s...")
-        time.sleep(10)
+        print(f"Not done yet, waiting {delay}s...")
+        time.sleep(delay)
+        # Generation takes minutes; back off so the tail of the wait isn't
+        # spent hammering fetchPredictOperation every 10s.
+        delay = min(delay * 2, 60)
 
 
 if __name__ == "__main__":